@@ -1,4 +1,5 @@
 import sys
+from itertools import islice
 from pynput import keyboard
 from src.components.card import Card
 from src.utils.misc import BUTTON_ICONS, str_to_bool
@@ -9,6 +10,8 @@ from src.settings_window import SettingsWindow
 from src.components.search_bar import SearchBar
 from src.components.tool_button import ToolButton
 from src.clipboard_manager import ClipboardManager
+from src.utils.file_preview import FilePreviewer, FilePreview
+from src.utils.thumbnail_cache import PREVIEW_THUMBNAIL
 from src.components.clipboard_list import ClipboardList
 from src.components.menu_button import MenuDropdownButton
 from src.components.color_button import ColorDropdownButton
@@ -18,6 +21,14 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QHBoxLayout, QLabel, QPushButton, QSystemTrayIcon, 
                                QListWidgetItem, QMessageBox)
 
+# Characters of a spilled (disk-backed) or compressed item shown in the preview
+PREVIEW_CHARS = 64 * 1024
+# Bigger HTML is previewed through its plain-text rendition
+PREVIEW_HTML_CHARS = 32 * 1024
+# Rows built in the list at first, and added each time it is scrolled to the
+# bottom; older entries stay in history and are found by search
+LIST_ROWS_STEP = 50
+
 
 class AppLayout(QMainWindow):
     def __init__(self):
@@ -56,6 +67,11 @@ class AppLayout(QMainWindow):
         # ===== clipbaord Card Widget =====
         self.list_widget: ClipboardList = ClipboardList()
         self.list_widget.itemClicked.connect(self.paste_item_action)
+        self.list_widget.delete_clicked.connect(self.on_clipboard_item_delete)
+        self._list_rows = LIST_ROWS_STEP
+        # Items found by the off-thread full-content scan of the current search
+        self._content_matches = set()
+        self.list_widget.verticalScrollBar().valueChanged.connect(self.on_list_scrolled)
         self.clipbaord_card = Card( title="Clipboard", content_widget=self.list_widget, contentsMargins=(0,0,0,0))
         # Add clipbaord_card to the content_area
         content_layout.addWidget(self.clipbaord_card)
@@ -93,8 +109,17 @@ class AppLayout(QMainWindow):
         # Create clipboard manager
         self.clipboard_manager = ClipboardManager()
         self.clipboard_manager.updated.connect(self.on_clipboard_update)
+        self.clipboard_manager.removed.connect(self.on_clipboard_update)
+        self.clipboard_manager.item_updated.connect(self.on_clipboard_item_updated)
+        self.clipboard_manager.content_search.found.connect(self.on_content_matches)
+        self.app_settings.setting_changed.connect(self.clipboard_manager.handle_setting_changed)
         self.clipboard_manager.start()
 
+        # File previews are read off the GUI thread, see on_file_preview
+        self.file_previewer = FilePreviewer(parent=self)
+        self.file_previewer.ready.connect(self.on_file_preview)
+        self._preview_path = None
+
         self._status_timer = QTimer(self)
         self._status_timer.setSingleShot(True)
         self._status_timer.timeout.connect(self._set_status_default)
@@ -110,21 +135,59 @@ class AppLayout(QMainWindow):
 
 
     def handle_search_action(self, search_text: str):
+        # Typing: let background work yield to the search
+        self.clipboard_manager.scheduler.notify_activity()
+        self._list_rows = LIST_ROWS_STEP
+        self._content_matches = set()
         if not search_text: # Handle enter & textchanged in same function
+            self.clipboard_manager.content_search.cancel()
+            self.update_history_display()
+            return
+
+        # Index hits show at once, full-content matches are added as they come
+        # (on_content_matches). Rows already shown are kept, only new matches
+        # get a widget.
+        hits = self.clipboard_manager.search(search_text, scan_content=True)
+        self.list_widget.sync(islice(hits, self._list_rows))
+
+    def on_content_matches(self, search_text: str, items):
+        if search_text != self.search_bar.search_input.text() or not items:
+            return  # stale, the query changed meanwhile
+        self._content_matches = {item.fingerprint() for item in items}
+        self.list_widget.sync(islice(self._search_results(search_text), self._list_rows))
+
+    def _search_results(self, search_text: str):
+        hits = self.clipboard_manager.search(search_text)
+        if not self._content_matches:
+            return hits
+        keys = {item.fingerprint() for item in hits} | self._content_matches
+        return [item for item in self.clipboard_manager.history if item.fingerprint() in keys]
+
+    def on_list_scrolled(self, value: int):
+        # Scrolled to the bottom of a full list: show the next rows
+        if value < self.list_widget.verticalScrollBar().maximum() or self.list_widget.count() < self._list_rows:
+            return
+        self._list_rows += LIST_ROWS_STEP
+        search_text = self.search_bar.search_input.text()
+        if search_text:
+            self.list_widget.sync(islice(self._search_results(search_text), self._list_rows))
+        else:
             self.update_history_display()
-        
-        self.list_widget.clear_items()
-        for item in self.clipboard_manager.history:
-            desc_text: str = item.search_text
-            if search_text.lower() in desc_text.lower():
-                widget = self.list_widget.add_item(item)
-                widget.delete_clicked.connect(self.on_clipboard_item_delete)
 
 
     def on_clipboard_update(self, text):
         self.update_history_display()
 
 
+    def on_clipboard_item_updated(self, item: ClipboardItemStruct):
+        # One entry changed in place (OCR): refresh its row, not the whole list
+        self.list_widget.update_item(item)
+        current = self.list_widget.currentItem()
+        widget = self.list_widget.itemWidget(current) if current else None
+        if widget and widget.clipboardItemStruct is item and item.ocr_text is not None \
+                and str_to_bool(self.app_settings.settings.value("ocr_mode")):
+            self.preview.swap_to_text(item.ocr_text)
+
     def clear_history(self):
         """Clear clipboard history"""
         reply = QMessageBox.question(self, 'Clear History', 
@@ -138,10 +201,8 @@ class AppLayout(QMainWindow):
             self.update_status(f"Monitoring clipboard... ({len(self.clipboard_manager.history)} items)")
 
     def update_history_display(self):
-        self.list_widget.clear_items()
-        for item in self.clipboard_manager.history:
-            widget = self.list_widget.add_item(item)
-            widget.delete_clicked.connect(self.on_clipboard_item_delete)
+        # A capture, paste or delete changes a row or two: sync, don't rebuild
+        self.list_widget.sync(islice(self.clipboard_manager.history, self._list_rows))
 
         self.update_status(f"Monitoring clipboard... ({len(self.clipboard_manager.history)} items)")
 
@@ -165,18 +226,43 @@ class AppLayout(QMainWindow):
         # Update selection
         self.list_widget.setCurrentItem(self.list_widget.item(0))
         is_ocr_mode = str_to_bool(self.app_settings.settings.value("ocr_mode"))
+        self._preview_path = None
 
-        if item_clip.content_type == "image":
-            if is_ocr_mode:
+        if item_clip.secret:
+            # Pasting gives the real content, the screen only ever shows it masked
+            self.preview.swap_to_text(item_clip.masked_text, plain=True)
+        elif item_clip.content_type == "image":
+            if is_ocr_mode and item_clip.ocr_text is not None:
                 self.preview.swap_to_text(item_clip.ocr_text)
             else:
-                self.preview.swap_to_image(item_clip.content)
+                # OCR still pending (or failed): the image until text arrives
+                # Pre-scaled on the capture pool, the full image is only a fallback
+                image = self.clipboard_manager.thumbnails.get(item_clip.fingerprint(), PREVIEW_THUMBNAIL)
+                self.preview.swap_to_image(image if image is not None else item_clip.content)
         elif item_clip.content_type == "url":
-            # TODO: check if is a file & read file content 
             self.preview.swap_to_text(", ".join(u.toString() for u in item_clip.content)) 
+            local = [u.toLocalFile() for u in item_clip.content if u.isLocalFile()]
+            if local:
+                # Replaced by the file's preview once the worker has read it
+                self._preview_path = local[0]
+                self.file_previewer.request(local[0])
+        elif item_clip.content_type == "html" and (item_clip.head_only or item_clip.content_length() > PREVIEW_HTML_CHARS):
+            # Laying out a whole web page blocks the UI, show its text instead
+            self.preview.swap_to_text(item_clip.plain_text, plain=True)
+        elif item_clip.head_only:
+            # Don't pull a huge payload back into memory just to show it
+            self.preview.swap_to_text(item_clip.preview_text(PREVIEW_CHARS), plain=True)
         else:
             self.preview.swap_to_text(item_clip.content)
 
+    def on_file_preview(self, preview: FilePreview):
+        if preview.path != self._preview_path:
+            return  # another item was selected meanwhile
+        if preview.kind == "image":
+            self.preview.swap_to_image(preview.image)
+        else:
+            self.preview.swap_to_text(preview.summary(), plain=True)
+
     def closeEvent(self, event):
         event.ignore()
         self.hide()
@@ -0,0 +1,19 @@
+from src.backends.base import ClipboardBackend
+from src.backends.qt_backend import QtClipboardBackend
+from src.backends.fake_backend import FakeClipboardBackend
+from src.backends.subprocess_backend import SubprocessClipboardBackend
+
+
+def make_backend(name: str = "qt", parent=None) -> ClipboardBackend:
+    """
+    Build the backend named by the `clipboard_backend` setting ("qt" or
+    "subprocess"). The in-memory fake is for tests only, never picked here.
+    """
+    if name == "subprocess":
+        try:
+            return SubprocessClipboardBackend(parent=parent)
+        except RuntimeError as e:
+            print(f"{e}, falling back to the Qt clipboard")
+    elif name != "qt":
+        print(f"Unknown clipboard backend {name!r}, using the Qt clipboard")
+    return QtClipboardBackend(parent=parent)
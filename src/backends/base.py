@@ -0,0 +1,43 @@
+from PySide6.QtCore import QObject, Signal, QMimeData
+from PySide6.QtGui import QClipboard
+
+
+class ClipboardBackend(QObject):
+    """
+    Where ClipboardManager reads clipboard content from and writes it to.
+
+    Backends that push change notifications emit `changed(mode)`; the manager
+    falls back to adaptive polling for backends that can't.
+    """
+    changed = Signal(object)  # QClipboard.Mode
+
+    def start(self):
+        """Begin watching for changes."""
+
+    def stop(self):
+        """Stop watching for changes."""
+
+    def notifies_changes(self) -> bool:
+        """True if `changed` fires reliably while the app is in the background."""
+        return False
+
+    def supports_selection(self) -> bool:
+        return False
+
+    def reads_block(self) -> bool:
+        """
+        True if `mime_data` and its payloads are read by blocking calls
+        (external commands) that are safe off the GUI thread: capture then
+        reads them on the pipeline's pool.
+        """
+        return False
+
+    def sequence_number(self, mode=QClipboard.Mode.Clipboard):
+        """Counter that moves on every change, or None if there is none."""
+        return None
+
+    def mime_data(self, mode=QClipboard.Mode.Clipboard) -> QMimeData:
+        raise NotImplementedError
+
+    def set_mime_data(self, mime: QMimeData, mode=QClipboard.Mode.Clipboard):
+        raise NotImplementedError
@@ -0,0 +1,79 @@
+from PySide6.QtCore import QMimeData
+from PySide6.QtGui import QClipboard
+from src.backends.base import ClipboardBackend
+
+
+class FakeClipboardBackend(ClipboardBackend):
+    """
+    In-memory clipboard for tests and benchmarks, no display server needed.
+
+    Writes bump a sequence counter and emit `changed` synchronously, so a
+    capture run is fully deterministic. Set `notifies=False` to exercise
+    the polling path instead, `blocking=True` to have capture read it on
+    a worker like a command-line backend.
+    """
+
+    def __init__(self, notifies=True, selection=True, blocking=False, parent=None):
+        super().__init__(parent)
+        self._notifies = notifies
+        self._blocking = blocking
+        self._selection = selection
+        self._watching = False
+        self._mime = {}
+        self._sequence = {}
+        self.reads = 0
+
+    def start(self):
+        self._watching = True
+
+    def stop(self):
+        self._watching = False
+
+    def notifies_changes(self):
+        return self._notifies
+
+    def supports_selection(self):
+        return self._selection
+
+    def reads_block(self):
+        return self._blocking
+
+    def sequence_number(self, mode=QClipboard.Mode.Clipboard):
+        return self._sequence.get(mode, 0)
+
+    def mime_data(self, mode=QClipboard.Mode.Clipboard):
+        self.reads += 1
+        return self._mime.get(mode)
+
+    def set_mime_data(self, mime, mode=QClipboard.Mode.Clipboard):
+        self._mime[mode] = mime
+        self._sequence[mode] = self._sequence.get(mode, 0) + 1
+        if self._watching and self._notifies:
+            self.changed.emit(mode)
+
+    # ------------------------------
+    # Helpers for driving the fake
+    # ------------------------------
+    def set_text(self, text, mode=QClipboard.Mode.Clipboard):
+        mime = QMimeData()
+        mime.setText(text)
+        self.set_mime_data(mime, mode)
+
+    def set_html(self, html, text="", mode=QClipboard.Mode.Clipboard):
+        mime = QMimeData()
+        mime.setHtml(html)
+        mime.setText(text)
+        self.set_mime_data(mime, mode)
+
+    def set_image(self, image, mode=QClipboard.Mode.Clipboard):
+        mime = QMimeData()
+        mime.setImageData(image)
+        self.set_mime_data(mime, mode)
+
+    def set_urls(self, urls, mode=QClipboard.Mode.Clipboard):
+        mime = QMimeData()
+        mime.setUrls(urls)
+        self.set_mime_data(mime, mode)
+
+    def clear(self, mode=QClipboard.Mode.Clipboard):
+        self.set_mime_data(QMimeData(), mode)
@@ -0,0 +1,56 @@
+import sys
+from PySide6.QtGui import QClipboard
+from PySide6.QtWidgets import QApplication
+from src.backends.base import ClipboardBackend
+from src.utils.clipboard_signature import os_sequence_number
+
+
+class QtClipboardBackend(ClipboardBackend):
+    """The system clipboard as seen through QApplication.clipboard()."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._watching = False
+
+    def start(self):
+        if self._watching:
+            return
+        cb = QApplication.clipboard()
+        cb.dataChanged.connect(self._on_data_changed)
+        cb.selectionChanged.connect(self._on_selection_changed)
+        self._watching = True
+
+    def stop(self):
+        if not self._watching:
+            return
+        cb = QApplication.clipboard()
+        cb.dataChanged.disconnect(self._on_data_changed)
+        cb.selectionChanged.disconnect(self._on_selection_changed)
+        self._watching = False
+
+    def notifies_changes(self):
+        # macOS only reports foreign clipboard changes on activation and Wayland
+        # only to the focused window, so background capture has to poll there.
+        if sys.platform == "darwin":
+            return False
+        return QApplication.platformName() != "wayland"
+
+    def supports_selection(self):
+        return QApplication.clipboard().supportsSelection()
+
+    def sequence_number(self, mode=QClipboard.Mode.Clipboard):
+        if mode != QClipboard.Mode.Clipboard:
+            return None
+        return os_sequence_number()
+
+    def mime_data(self, mode=QClipboard.Mode.Clipboard):
+        return QApplication.clipboard().mimeData(mode)
+
+    def set_mime_data(self, mime, mode=QClipboard.Mode.Clipboard):
+        QApplication.clipboard().setMimeData(mime, mode)
+
+    def _on_data_changed(self):
+        self.changed.emit(QClipboard.Mode.Clipboard)
+
+    def _on_selection_changed(self):
+        self.changed.emit(QClipboard.Mode.Selection)
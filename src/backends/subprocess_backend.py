@@ -0,0 +1,204 @@
+import os
+import shutil
+import subprocess
+from PySide6.QtGui import QClipboard, QImage
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QMimeData, QProcess, QTimer, QByteArray
+from src.backends.base import ClipboardBackend
+
+# Seconds a single content read may take before it is abandoned
+READ_TIMEOUT = 2
+# Delay before relaunching a watcher that died unexpectedly
+RESTART_DELAY_MS = 1000
+
+# X11 housekeeping targets, never content
+_META_TARGETS = {"TARGETS", "MULTIPLE", "TIMESTAMP", "SAVE_TARGETS", "DELETE", "INCR"}
+_TEXT_TARGETS = ("text/plain;charset=utf-8", "UTF8_STRING", "text/plain", "STRING", "TEXT")
+
+_SELECTION_NAMES = {
+    QClipboard.Mode.Clipboard: "clipboard",
+    QClipboard.Mode.Selection: "primary",
+}
+
+
+class _SubprocessMimeData(QMimeData):
+    """Clipboard snapshot whose payloads are read by a command when asked for."""
+
+    def __init__(self, targets, read_target):
+        super().__init__()
+        self._targets = [t for t in targets if t and t not in _META_TARGETS]
+        self._read_target = read_target
+        self._cache = {}
+
+        formats = [t for t in self._targets if t.islower() or "/" in t]
+        if "text/plain" not in formats and any(t in self._targets for t in _TEXT_TARGETS):
+            formats.append("text/plain")
+        if any(t.startswith("image/") for t in self._targets):
+            formats.append("application/x-qt-image")
+        self._formats = formats
+
+    def formats(self):
+        return list(self._formats)
+
+    def hasFormat(self, mimetype):
+        return mimetype in self._formats
+
+    def _read(self, target) -> bytes:
+        if target not in self._cache:
+            self._cache[target] = self._read_target(target)
+        return self._cache[target]
+
+    def retrieveData(self, mimetype, preferred_type):
+        if mimetype == "application/x-qt-image":
+            for target in self._targets:
+                if target.startswith("image/"):
+                    return QImage.fromData(self._read(target))
+            return None
+
+        if mimetype.startswith("text/plain"):
+            for target in _TEXT_TARGETS:
+                if target in self._targets:
+                    return self._read(target).decode("utf-8", errors="replace")
+            return None
+
+        if mimetype in self._targets:
+            return QByteArray(self._read(mimetype))
+        return None
+
+
+class SubprocessClipboardBackend(ClipboardBackend):
+    """
+    Clipboard watched by external command-line tools, pushing change events.
+
+    Wayland: `wl-paste --watch` prints a line on every change.
+    X11: `clipnotify` exits on every change and is relaunched, content is
+    read with `xclip`.
+
+    Writes go through the Qt clipboard: the window has focus whenever the
+    user picks an item, which is all Wayland requires. Reads only run
+    commands (no Qt clipboard access), so capture does them on a worker.
+    """
+
+    def __init__(self, tool: str = None, parent=None):
+        super().__init__(parent)
+        self.tool = tool or self.detect_tool()
+        if self.tool is None:
+            raise RuntimeError("Neither wl-paste nor xclip + clipnotify is available")
+        self._watching = False
+        self._watchers = {}
+        self._sequence = {}
+
+    @staticmethod
+    def detect_tool():
+        if os.environ.get("WAYLAND_DISPLAY") and shutil.which("wl-paste"):
+            return "wl-paste"
+        if os.environ.get("DISPLAY") and shutil.which("xclip") and shutil.which("clipnotify"):
+            return "xclip"
+        return None
+
+    # ------------------------------
+    # Commands
+    # ------------------------------
+    def _watch_command(self, mode):
+        if self.tool == "wl-paste":
+            args = ["--watch", "echo"]
+            if mode == QClipboard.Mode.Selection:
+                args.insert(0, "--primary")
+            return "wl-paste", args
+        return "clipnotify", ["-s", _SELECTION_NAMES[mode]]
+
+    def _list_command(self, mode):
+        if self.tool == "wl-paste":
+            cmd = ["wl-paste", "--list-types"]
+            if mode == QClipboard.Mode.Selection:
+                cmd.append("--primary")
+            return cmd
+        return ["xclip", "-o", "-selection", _SELECTION_NAMES[mode], "-t", "TARGETS"]
+
+    def _read_command(self, mode, target):
+        if self.tool == "wl-paste":
+            cmd = ["wl-paste", "--no-newline", "--type", target]
+            if mode == QClipboard.Mode.Selection:
+                cmd.append("--primary")
+            return cmd
+        return ["xclip", "-o", "-selection", _SELECTION_NAMES[mode], "-t", target]
+
+    def _run(self, cmd) -> bytes:
+        try:
+            result = subprocess.run(cmd, capture_output=True, timeout=READ_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"Clipboard command failed: {cmd[0]}: {e}")
+            return b""
+        return result.stdout if result.returncode == 0 else b""
+
+    # ------------------------------
+    # Watching
+    # ------------------------------
+    def start(self):
+        if self._watching:
+            return
+        self._watching = True
+        for mode in _SELECTION_NAMES:
+            self._launch(mode)
+
+    def stop(self):
+        self._watching = False
+        for proc in self._watchers.values():
+            proc.kill()
+            proc.waitForFinished(500)
+        self._watchers.clear()
+
+    def _launch(self, mode):
+        if not self._watching:
+            return
+        program, args = self._watch_command(mode)
+        proc = QProcess(self)
+        proc.readyReadStandardOutput.connect(lambda m=mode, p=proc: self._on_output(m, p))
+        proc.finished.connect(lambda code, status, m=mode: self._on_finished(m, code))
+        self._watchers[mode] = proc
+        proc.start(program, args)
+
+    def _notify(self, mode):
+        self._sequence[mode] = self._sequence.get(mode, 0) + 1
+        self.changed.emit(mode)
+
+    def _on_output(self, mode, proc):
+        # Several changes may arrive in one read; one notification is enough
+        proc.readAllStandardOutput()
+        self._notify(mode)
+
+    def _on_finished(self, mode, exit_code):
+        if not self._watching:
+            return
+        if self.tool == "xclip" and exit_code == 0:
+            # clipnotify exits once per change
+            self._notify(mode)
+            self._launch(mode)
+        else:
+            QTimer.singleShot(RESTART_DELAY_MS, lambda: self._launch(mode))
+
+    # ------------------------------
+    # Content
+    # ------------------------------
+    def notifies_changes(self):
+        return True
+
+    def supports_selection(self):
+        return True
+
+    def reads_block(self):
+        # Every listing and payload read is a process: keep them off the GUI thread
+        return True
+
+    def sequence_number(self, mode=QClipboard.Mode.Clipboard):
+        return self._sequence.get(mode, 0)
+
+    def mime_data(self, mode=QClipboard.Mode.Clipboard):
+        listing = self._run(self._list_command(mode))
+        targets = listing.decode("utf-8", errors="replace").splitlines()
+        if not targets:
+            return None
+        return _SubprocessMimeData(targets, lambda target: self._run(self._read_command(mode, target)))
+
+    def set_mime_data(self, mime, mode=QClipboard.Mode.Clipboard):
+        QApplication.clipboard().setMimeData(mime, mode)
@@ -1,152 +1,671 @@
-from typing import List, Set
+import time
+from typing import Set
 from functools import partial
-from src.utils.misc import str_to_bool
-from PySide6.QtWidgets import QApplication
+from src.utils.misc import str_to_bool, cache_dir
+from PySide6.QtGui import QClipboard
+from src.backends import ClipboardBackend, make_backend
+from src.utils.adaptive_poller import AdaptivePoller
+from src.utils.clipboard_signature import clipboard_signature
+from src.components.clipboard_history import ClipboardHistory, DEFAULT_QUOTAS
 from src.settings_window import SettingsWindow
 from src.utils.network_access_manager import OCRClient
-from PySide6.QtCore import QObject, QTimer, Signal, QMimeData, QBuffer, QByteArray, QIODevice
-from src.components.cliboard_item_struct import ClipboardItemStruct, is_real_html
+from PySide6.QtCore import QObject, QTimer, Signal
+from src.utils.item_mime_data import ItemMimeData
+from src.utils.search_index import SearchIndex
+from src.utils.content_search import ContentSearch
+from src.utils.blob_store import BlobStore
+from src.utils.secret_filter import SecretFilter
+from src.utils.thumbnail_cache import ThumbnailCache
+from src.utils.image_codec import CompressedImage, ImageCompressor, decoded_images
+from src.utils.image_hash import BKTree, mean_difference
+from src.utils.idle_scheduler import IdleScheduler
+from src.utils.capture_pipeline import CapturePipeline, CaptureResult, ClipboardSnapshot
+from src.components.cliboard_item_struct import ClipboardItemStruct, SELF_MIME_FORMAT, SPILL_HEAD_CHARS
+
+
+# Idle task priorities, lower runs first
+PRIORITY_TEXT_REBASE = 30
+PRIORITY_IMAGE_COMPRESS = 40
+PRIORITY_OCR_BACKFILL = 50
+PRIORITY_BLOB_GC = 70
 
 
 class ClipboardManager(QObject):
     updated = Signal(ClipboardItemStruct)
+    item_updated = Signal(ClipboardItemStruct)  # an entry changed in place (OCR state/text)
+    removed = Signal(ClipboardItemStruct)  # left history on its own (expired secret, replaced near-duplicate)
+
+    # "event": QClipboard change signals only
+    # "poll":  adaptive polling, for platforms that don't notify background apps
+    # "auto":  event where notifications are reliable, poll elsewhere
+    CAPTURE_MODES = ("auto", "event", "poll")
+
+    # What happens to a capture holding a secret (password, API key, token):
+    # "skip": never enters history or the search index
+    # "mask": kept for pasting, shown and indexed with the secret masked
+    # "expire": like "mask", and removed after secret_ttl seconds
+    # "off": no secret filtering
+    SECRET_POLICIES = ("skip", "mask", "expire", "off")
 
-    def __init__(self, poll_interval=300, parent=None):
+    # What happens to an image that looks like one already in history (same
+    # size, perceptual hashes within near_duplicate_distance bits, thumbnail
+    # colours within NEAR_DUPLICATE_TOLERANCE):
+    # "keep": both stay (default: looking alike is not being the same)
+    # "replace": the new capture takes the place of the older ones
+    # "skip": dropped, like an exact duplicate
+    NEAR_DUPLICATE_POLICIES = ("keep", "replace", "skip")
+    NEAR_DUPLICATE_TOLERANCE = 4
+
+    def __init__(self, poll_interval=300, parent=None, backend: ClipboardBackend = None):
         super().__init__(parent)
         self.app_settings = SettingsWindow(user_theme="DEFAULT")
         self.app_settings.setting_changed.connect(self.handle_setting_changed)
         self.ocr_client = OCRClient()
         self.current_ocr_item: ClipboardItemStruct = None
 
-        self.history: List[ClipboardItemStruct] = []
+        self.search_index = SearchIndex()
+        # The index only holds the head of spilled and compressed items, the
+        # rest is scanned off the GUI thread (see `search`)
+        self.content_search = ContentSearch(parent=self)
         self._ignored_digests: Set[str] = set()
-        self.max_items = 50
-        self._last_digest = None
+        self._last_digest = {}
+        self._last_signature = {}
+
+        settings = self.app_settings.settings
+        self.backend = backend or make_backend(settings.value("clipboard_backend", "qt"), parent=self)
+
+        self.capture_mode = settings.value("capture_mode", "auto")
+        if self.capture_mode not in self.CAPTURE_MODES:
+            self.capture_mode = "auto"
+        # X11 PRIMARY selection (select-to-copy), off by default
+        self.capture_selection = str_to_bool(settings.value("capture_selection", False))
+
+        self._listening = False
+        self._backend_running = False
+        self._poller = AdaptivePoller(
+            min_interval=poll_interval,
+            max_interval=int(settings.value("poll_max_interval", 3000)),
+            parent=self,
+        )
+        self._poller.timeout.connect(self._poll_all)
+
+        # Burst coalescing: change notifications restart a short window and
+        # only the settled clipboard value is captured when it expires
+        self.coalesce_ms = int(settings.value("coalesce_ms", 150))
+        self.coalesce_max_ms = int(settings.value("coalesce_max_ms", 1000))
+        self._pending_modes = set()
+        self._burst_started = None
+        self._coalesce_timer = QTimer(self)
+        self._coalesce_timer.setSingleShot(True)
+        self._coalesce_timer.timeout.connect(self._flush_pending)
+
+        # Payloads above spill_threshold (characters of text, bytes of image pixels
+        # or formats) live on disk, 0 keeps all in memory. History is not
+        # persisted, so blobs left by a previous run are dropped.
+        self.spill_threshold = int(settings.value("spill_threshold", 1024 * 1024))
+        # Text kept in memory above compress_threshold characters is zlib-compressed
+        # (delta-encoded against recent texts when close), 0 keeps it plain
+        self.compress_threshold = int(settings.value("compress_threshold", 16 * 1024))
+        self.blob_store = BlobStore(cache_dir("blobs"))
+        self.blob_store.purge()
+        self._blob_gc_scheduled = False
+        # The item last written to the clipboard holds its own blob references
+        self._clipboard_item = None
+
+        # Entries are bounded by count and by memory: over a type's quota the
+        # oldest payloads move to the blob store (disk tier), and entries are
+        # only dropped once that is not enough. The disk tier has its own
+        # budget, past it the oldest entries on disk are dropped.
+        quotas = dict(DEFAULT_QUOTAS)
+        for content_type in quotas:
+            quotas[content_type] = float(settings.value(f"history_quota_{content_type}", quotas[content_type]))
+        self.history = ClipboardHistory(
+            max_items=int(settings.value("max_items", 20000)),
+            max_bytes=int(settings.value("history_memory_mb", 256)) * 1024 * 1024,
+            quotas=quotas,
+            demote=self._demote,
+            max_disk_bytes=int(settings.value("history_disk_mb", 2048)) * 1024 * 1024,
+        )
+
+        self.secret_policy = settings.value("secret_policy", "skip")
+        if self.secret_policy not in self.SECRET_POLICIES:
+            self.secret_policy = "skip"
+        self.secret_ttl = int(settings.value("secret_ttl", 30))
+        patterns = settings.value("secret_patterns", [])
+        if isinstance(patterns, str):
+            patterns = [p for p in patterns.splitlines() if p.strip()]
+        self.secret_filter = SecretFilter(
+            user_patterns=patterns,
+            min_entropy=float(settings.value("secret_min_entropy", 4.0)),
+        )
+
+        self.near_duplicate_policy = settings.value("near_duplicate_policy", "keep")
+        if self.near_duplicate_policy not in self.NEAR_DUPLICATE_POLICIES:
+            self.near_duplicate_policy = "keep"
+        self.near_duplicate_distance = int(settings.value("near_duplicate_distance", 8))
+        # Perceptual hashes of the images in history
+        self.image_hashes = BKTree()
+
+        # Image thumbnails are scaled once per entry and deleted with it, the
+        # cache directory stays under its disk budget. Not kept across runs:
+        # like blobs, those left by a previous run belong to no history
+        self.thumbnails = ThumbnailCache(cache_dir("thumbnails"))
+        self.thumbnails.clear()
+
+        # Images left in memory are PNG-encoded when idle, off the GUI thread
+        self.image_compressor = ImageCompressor(parent=self)
+        self.image_compressor.compressed.connect(self._on_image_compressed)
+        self.image_compressor.encoded.connect(self._on_ocr_payload)
+        self._compress_scheduled = False
+        self._compress_in_flight: Set[str] = set()
+        # Images demoted while still raw pixels: spilled once PNG-encoded
+        self._spill_on_compress: Set[str] = set()
+        # Delta-encoded texts whose base left memory are re-encoded when idle
+        self._rebase_scheduled = False
+
+        # Heavy capture work runs on a pool, only the commit comes back here
+        self.pipeline = CapturePipeline(
+            is_known=self.history.__contains__,
+            max_workers=int(settings.value("capture_workers", 2)),
+            store=self.blob_store,
+            spill_threshold=self.spill_threshold,
+            secret_filter=self.secret_filter,
+            secret_policy=self.secret_policy,
+            thumbnails=self.thumbnails,
+            compress_threshold=self.compress_threshold,
+            parent=self,
+        )
+        self.pipeline.captured.connect(self._commit_capture)
+
+        # Deferred maintenance work, run only while capture and the UI are idle
+        self.scheduler = IdleScheduler(parent=self)
+        self._ocr_in_flight: Set[str] = set()
+
+    @property
+    def max_items(self):
+        return self.history.max_items
+
+    @max_items.setter
+    def max_items(self, value):
+        self.history.max_items = value
+        for evicted in self.history.trim():
+            self._forget(evicted)
 
-        self._timer = QTimer(self)
-        self._timer.setInterval(poll_interval)
-        self._timer.timeout.connect(self._poll)
-        
     def handle_setting_changed(self):
         print("========== SETTINGS CHANGED ==========")
         print(self.app_settings.settings.value("ocr_mode"))
         print(self.app_settings.settings.value("user_theme"))
         print(self.app_settings.settings.value("api_url"))
         print("========== SETTINGS CHANGED ==========")
+        if str_to_bool(self.app_settings.settings.value("ocr_mode")):
+            # Images captured while OCR was off get their text in the background
+            self.scheduler.schedule(self._ocr_backfill, priority=PRIORITY_OCR_BACKFILL, name="ocr_backfill")
+
+    def _watched_modes(self):
+        modes = [QClipboard.Mode.Clipboard]
+        if self.capture_selection and self.backend.supports_selection():
+            modes.append(QClipboard.Mode.Selection)
+        return modes
+
+    def _uses_events(self):
+        if self.capture_mode != "auto":
+            return self.capture_mode == "event"
+        return self.backend.notifies_changes()
 
     def start(self):
-        self._timer.start()
+        # Started in poll mode too: watcher backends only move their
+        # sequence number (the poll's change check) while they run
+        if not self._backend_running:
+            self.backend.start()
+            self._backend_running = True
+        if self._uses_events():
+            self.backend.changed.connect(self._on_backend_changed)
+            self._listening = True
+        else:
+            self._poller.start()
+        # Pick up whatever is already on the clipboard
+        self._poll_all()
 
     def stop(self):
-        self._timer.stop()
+        self._poller.stop()
+        self.scheduler.clear()
+        self._blob_gc_scheduled = False
+        self._compress_scheduled = False
+        self._coalesce_timer.stop()
+        self._pending_modes.clear()
+        self._burst_started = None
+        self.content_search.cancel()
+        if self._listening:
+            self.backend.changed.disconnect(self._on_backend_changed)
+            self._listening = False
+        if self._backend_running:
+            self.backend.stop()
+            self._backend_running = False
 
-    def _poll(self):
-        cb = QApplication.clipboard()
-        mime = cb.mimeData()
+    def _on_backend_changed(self, mode):
+        if mode in self._watched_modes():
+            self._schedule_capture(mode)
 
-        item = None
+    def _schedule_capture(self, mode):
+        """Capture `mode` once it stops changing for `coalesce_ms`."""
+        if self.coalesce_ms <= 0:
+            self._poll(mode)
+            return
 
-        if mime.hasImage():
-            img_content = mime.imageData()
-            item = ClipboardItemStruct(img_content, "image")
+        self._pending_modes.add(mode)
+        now = time.monotonic()
+        if self._burst_started is None:
+            self._burst_started = now
+        elif (now - self._burst_started) * 1000 >= self.coalesce_max_ms:
+            # Never-ending burst (e.g. dragging a selection): let the timer fire
+            return
+        self._coalesce_timer.start(self.coalesce_ms)
 
-        elif mime.hasUrls():
-            item = ClipboardItemStruct(mime.urls(), "url")
+    def _flush_pending(self):
+        modes, self._pending_modes = self._pending_modes, set()
+        self._burst_started = None
+        for mode in modes:
+            self._poll(mode)
 
-        elif mime.hasHtml():
-            text_ = mime.text()
-            if is_real_html(text_):
-                item = ClipboardItemStruct(mime.html(), "html")
-            else:
-                item = ClipboardItemStruct(text_, "text")
-            
-        elif mime.hasText():
-            item = ClipboardItemStruct(mime.text(), "text")
+    def _poll_all(self):
+        for mode in self._watched_modes():
+            if self._poll(mode):
+                self._poller.notify_activity()
 
-        else:
-            return  # unknown type, ignore
+    def _poll(self, mode=QClipboard.Mode.Clipboard) -> bool:
+        """Capture the current content of `mode`, return True if it was new."""
+        if self.backend.reads_block():
+            return self._poll_deferred(mode)
+        mime = self.backend.mime_data(mode)
+        if mime is None:
+            return False
+
+        # Our own write (history item pasted back): just reorder, no conversion.
+        # Checked before the signature so our lazy payloads are never rendered.
+        if mime.hasFormat(SELF_MIME_FORMAT):
+            digest = mime.data(SELF_MIME_FORMAT).data().decode()
+            if self.history.move_to_front(digest):
+                self._last_digest[mode] = digest
+                self._last_signature.pop(mode, None)
+                return False
+
+        # Cheap change detection before any payload is materialized
+        signature = clipboard_signature(mime, self.backend.sequence_number(mode))
+        if signature is not None and signature == self._last_signature.get(mode):
+            return False
+        self._last_signature[mode] = signature
+
+        # Real clipboard activity: keep deferred work out of the way
+        self.scheduler.notify_activity()
+
+        # Password managers flag their copies: don't even read the payload
+        concealed = self.secret_policy != "off" and self.secret_filter.is_concealed(mime)
+        if concealed and self.secret_policy == "skip":
+            return False
 
-        digest = item.digest()
+        want_ocr = str_to_bool(self.app_settings.settings.value("ocr_mode"))
+        snapshot = ClipboardSnapshot.read(mime, mode, want_ocr=want_ocr, concealed=concealed)
+        if snapshot is None:
+            return False  # unknown type, ignore
+
+        self.pipeline.submit(snapshot)
+        return True
+
+    def _poll_deferred(self, mode) -> bool:
+        """`_poll` for backends whose reads block: only the sequence number is checked here."""
+        sequence = self.backend.sequence_number(mode)
+        signature = None if sequence is None else ("seq", sequence)
+        if signature is not None and signature == self._last_signature.get(mode):
+            return False
+        self._last_signature[mode] = signature
+        self.scheduler.notify_activity()
+        want_ocr = str_to_bool(self.app_settings.settings.value("ocr_mode"))
+        self.pipeline.submit(partial(self._read_snapshot, mode, want_ocr, self.secret_policy))
+        return True
+
+    def _read_snapshot(self, mode, want_ocr, secret_policy):
+        """Worker thread: list and read the clipboard of a blocking backend."""
+        mime = self.backend.mime_data(mode)
+        # Our own write is already at the front of history (see add_item_at_start)
+        if mime is None or mime.hasFormat(SELF_MIME_FORMAT):
+            return None
+        concealed = secret_policy != "off" and SecretFilter.is_concealed(mime)
+        if concealed and secret_policy == "skip":
+            return None
+        return ClipboardSnapshot.read(mime, mode, want_ocr=want_ocr, concealed=concealed)
+
+    def _commit_capture(self, result: CaptureResult):
+        """GUI thread: the pipeline finished with one snapshot."""
+        item = result.item
+        if item is None:
+            return  # secret, kept out of history
+        mode = result.mode
+        digest = item.fingerprint()
+        last_digest = self._last_digest.get(mode)
 
         # If the clipboard content changed from the last digest
-        if digest != self._last_digest:
+        if digest != last_digest:
             # Clear ignored digests for old deleted items
             self._ignored_digests.clear()
 
-        already_exist = any(existing_item.digest() == digest for existing_item in self.history)
-        if digest == self._last_digest or already_exist or digest in self._ignored_digests:
+        # Dedupe again: history may have changed while the snapshot was in flight
+        already_exist = result.duplicate or digest in self.history
+        if digest == last_digest or already_exist or digest in self._ignored_digests:
+            self._last_digest[mode] = digest
+            self._release(item)  # may have spilled before losing the race
             return  # same as previous → ignore
 
-        self._last_digest = digest
+        self._last_digest[mode] = digest
+        near = self.near_duplicates(item) if self.near_duplicate_policy != "keep" else []
+        if near and self.near_duplicate_policy == "skip":
+            self._release(item)
+            return
+        if self.near_duplicate_policy == "replace":
+            for older in near:
+                self.history.remove(older.fingerprint())
+                self._forget(older)
+                self.removed.emit(older)
+        self._add_to_history(item, ocr_payload=result.ocr_payload, search_text=result.search_text)
+        if item.secret and self.secret_policy == "expire":
+            QTimer.singleShot(self.secret_ttl * 1000, partial(self._expire_secret, digest))
+
+    def _expire_secret(self, digest: str):
+        item = self.history.get(digest)
+        if item is None or not item.secret:
+            return
+        self.history.remove(digest)
+        self._forget(item)
+        self.removed.emit(item)
+
+    def near_duplicates(self, item: ClipboardItemStruct):
+        """Images in history of the same size as `item` that look the same, closest first."""
+        if item.perceptual_hash is None:
+            return []
+        found = []
+        for _, digest in self.image_hashes.search(item.perceptual_hash, self.near_duplicate_distance):
+            other = self.history.get(digest)
+            if other is None or other is item or other.image_size() != item.image_size():
+                continue
+            if item.thumbnail is not None and other.thumbnail is not None \
+                    and mean_difference(item.thumbnail, other.thumbnail) > self.NEAR_DUPLICATE_TOLERANCE:
+                continue
+            found.append(other)
+        return found
+
+    def search(self, search_text: str, kind: str = None, scan_content=False):
+        """
+        History items matching `search_text` (and of `kind`, if given), in
+        recency order, from the index: only the head of spilled and
+        compressed items is searched. With `scan_content`, their full
+        content is searched too, off-thread; matches arrive through
+        `content_search.found`, a newer search cancels the scan.
+        """
+        items = [item for item in self.history if kind is None or item.kind == kind]
+        if not search_text:
+            self.content_search.cancel()
+            return items
+        matches = self.search_index.search(search_text)
+        found = [item for item in items if item.fingerprint() in matches]
+        if scan_content:
+            self.content_search.request(search_text, [
+                item for item in items
+                if item.head_only and not item.secret and item.fingerprint() not in matches])
+        return found
 
-        self._add_to_history(item)
-        
 
     def set_clipboard(self, item: ClipboardItemStruct):
-        clipboard = QApplication.clipboard()
-        if item.content_type == "image":
-            # pixmap = QPixmap("path/to/image.png")
-            clipboard.setImage(item.content) 
-        elif item.content_type == "url":
-            mime_data = QMimeData()
-            mime_data.setUrls(item.content)
-            clipboard.setMimeData(mime_data)
-        else:
-            clipboard.setText(item.content)
+        # Formats are only announced here, payloads render when a target pastes.
+        # The mime data carries SELF_MIME_FORMAT so capture skips our own write.
+        # Its spilled blobs stay readable even if history drops it meanwhile.
+        item.retain()
+        if self._clipboard_item is not None:
+            self._release(self._clipboard_item)
+        self._clipboard_item = item
+        self.backend.set_mime_data(ItemMimeData(item))
 
 
     def clear_history(self):
+        for item in self.history:
+            self._release(item)
         self.history.clear()
+        decoded_images.clear()
+        self.pipeline.recent_texts.clear()
+        self.image_hashes.clear()
+        self.thumbnails.clear()
+        self.search_index.clear()
 
     def remove_from_history(self, item: ClipboardItemStruct):
-        target = item.digest()
-        self.history = [x for x in self.history if x.digest() != target]
+        target = item.fingerprint()
+        removed = self.history.remove(target)
+        if removed is not None:
+            self._forget(removed)
         self._ignored_digests.add(target)
-        
+
+    def _forget(self, item: ClipboardItemStruct):
+        """An item left history: drop its index entry, spilled blobs and cached thumbnails."""
+        self.search_index.remove(item.fingerprint())
+        self.image_hashes.remove(item.fingerprint())
+        self.thumbnails.forget(item.fingerprint())
+        decoded_images.forget(item.fingerprint())
+        if self._is_text_base(item.compressed_text()):
+            self._schedule_rebase()
+        self._release(item)
+
+    def _demote(self, item: ClipboardItemStruct):
+        """History over budget: move the item's payloads to disk, it stays listed."""
+        # Secrets never go to disk; payloads no bigger than the kept head gain nothing
+        if item.secret:
+            return
+        image = item.raw_image()
+        if image is not None:
+            # Not PNG-encoded here on the GUI thread: spilled when the compressor is done
+            digest = item.fingerprint()
+            self._spill_on_compress.add(digest)
+            if digest not in self._compress_in_flight:
+                self._compress_in_flight.add(digest)
+                self.image_compressor.request(item, image)
+            return
+        pinned = item is self._clipboard_item
+        if pinned:
+            item.release()  # re-taken below, on the blobs spill creates too
+        text = item.compressed_text()
+        item.spill(self.blob_store, SPILL_HEAD_CHARS)
+        if pinned:
+            item.retain()
+        if self._is_text_base(text) and item.compressed_text() is None:
+            self._schedule_rebase()
+
+    def _release(self, item: ClipboardItemStruct):
+        """Drop one reference on the item's blobs, unreferenced ones are deleted when idle."""
+        item.release()
+        if self.blob_store.has_garbage() and not self._blob_gc_scheduled:
+            self._blob_gc_scheduled = True
+            self.scheduler.schedule(self._collect_blobs, priority=PRIORITY_BLOB_GC, name="blob_gc")
+
+    def _collect_blobs(self):
+        self._blob_gc_scheduled = False
+        yield from self.blob_store.collect()
 
     def add_item_at_start(self, item: ClipboardItemStruct):
-        target = item.digest()
-        # Remove any existing item with the same digest
-        for i, existing_item in enumerate(self.history):
-            if existing_item.digest() == target:
-                self.history.pop(i)
-                break
-        # Insert at the beginning
-        self.history.insert(0, item)
+        # Move the existing entry (or insert this one) to the beginning
+        if not self.history.move_to_front(item.fingerprint()):
+            # Back into history after being dropped: history holds it again
+            item.retain()
+            self._insert(item)
+
+    def _insert(self, item: ClipboardItemStruct, search_text: str = None):
+        """Add to history and keep the search index in step with evictions."""
+        if search_text is not None:
+            self.search_index.add(item.fingerprint(), search_text, normalized=True)
+        elif item.fingerprint() not in self.search_index:
+            self.search_index.add(item.fingerprint(), item.search_text)
+        if item.perceptual_hash is not None:
+            self.image_hashes.add(item.fingerprint(), item.perceptual_hash)
+        for evicted in self.history.add(item):
+            self._forget(evicted)
 
 
+    def _request_ocr(self, item: ClipboardItemStruct, source=None):
+        """Send `item` to the OCR server; the result is attached to it in place."""
+        self._ocr_in_flight.add(item.fingerprint())
+        item.set_ocr_state("pending")
+        if source is None:
+            # A compressed image uploads as is, no decode and re-encode
+            source = item.encoded_png()
+        if source is None:
+            # Raw or spilled: encoded / read back on the pool, sent from _on_ocr_payload
+            self.image_compressor.request_png(item)
+            return
+        self._send_ocr(item, source)
+
+    def _send_ocr(self, item: ClipboardItemStruct, png):
+        self.ocr_client.send_ocr_request(
+            png,
+            api_url=self.app_settings.settings.value("api_url"),
+            callback=partial(self.on_ocr_result, item=item),
+            error_callback=partial(self.on_ocr_error, item=item),
+        )
+
+    def _on_ocr_payload(self, item: ClipboardItemStruct, png):
+        if item.fingerprint() not in self._ocr_in_flight:
+            return  # history cleared meanwhile
+        if item.fingerprint() not in self.history:
+            self._ocr_in_flight.discard(item.fingerprint())
+            return
+        if png is None:
+            self.on_ocr_error("Image unavailable for OCR", item)
+            return
+        self._send_ocr(item, png)
+
     def on_ocr_result(self, result, item: ClipboardItemStruct):
-        # Update the item with OCR text
-        updated_item = item.set_ocr_text(result.get('text'))
-        
-        # Insert at the beginning of history
-        self.history.insert(0, updated_item)
-        self.current_ocr_item = updated_item
-        
-        # NOW emit the updated signal with OCR text
-        self.updated.emit(updated_item)
-        
-        # Trim history if needed
-        if len(self.history) > self.max_items:
-            self.history.pop(len(self.history) - 1)
-
-    def _add_to_history(self, item: ClipboardItemStruct):
-        api_url_ = self.app_settings.settings.value("api_url")
-        
-        if item.content_type == "image":
-            if str_to_bool(self.app_settings.settings.value("ocr_mode")):
-                callback_with_args = partial(self.on_ocr_result, item=item)
-                self.ocr_client.send_ocr_request(item.content, api_url=api_url_, callback=callback_with_args)
-            else:
-                self.history.insert(0, item)
-                self.updated.emit(item)
-                
-                if len(self.history) > self.max_items:
-                    self.history.pop(len(self.history) - 1)
-        else:
-            self.history.insert(0, item)
-            self.updated.emit(item)
-            
-            if len(self.history) > self.max_items:
-                self.history.pop(len(self.history) - 1)
+        self._ocr_in_flight.discard(item.fingerprint())
+        item.set_ocr_text(result.get('text'))
+        self.current_ocr_item = item
+        if item.fingerprint() in self.history:
+            self.search_index.append(item.fingerprint(), item.ocr_text)
+            for evicted in self.history.refresh(item):
+                self._forget(evicted)
+            self.item_updated.emit(item)
+
+    def on_ocr_error(self, error: str, item: ClipboardItemStruct):
+        self._ocr_in_flight.discard(item.fingerprint())
+        # Stays in history without text; the next backfill retries it
+        item.set_ocr_state("failed")
+        if item.fingerprint() in self.history:
+            self.item_updated.emit(item)
+
+    def _ocr_backfill(self):
+        """Idle task: one OCR request per step for images that have no text yet."""
+        for item in self.history:
+            if item.content_type != "image" or item.ocr_text is not None or item.fingerprint() in self._ocr_in_flight:
+                continue
+            self._request_ocr(item)
+            self.item_updated.emit(item)
+            yield
+
+    def _add_to_history(self, item: ClipboardItemStruct, ocr_payload=None, search_text=None):
+        # Images are listed at once, OCR text is attached when it arrives
+        if item.content_type == "image" and str_to_bool(self.app_settings.settings.value("ocr_mode")):
+            # PNG already encoded by the pipeline when OCR was on at capture
+            self._request_ocr(item, ocr_payload)
+        self._insert(item, search_text)
+        if item.content_type == "image" and not item.spilled:
+            self._schedule_compression()
+        text = item.compressed_text()
+        if text is not None and text.is_delta:
+            # Its base may have left history while the capture was in flight
+            self._schedule_rebase()
+        self.updated.emit(item)
+
+    # ------------------------------
+    # Delta-encoded texts
+    # ------------------------------
+    @staticmethod
+    def _is_text_base(text) -> bool:
+        return text is not None and not text.is_delta
+
+    def _schedule_rebase(self):
+        if not self._rebase_scheduled:
+            self._rebase_scheduled = True
+            self.scheduler.schedule(self._rebase_texts, priority=PRIORITY_TEXT_REBASE, name="text_rebase")
+
+    def _rebase_texts(self):
+        """
+        Idle task: re-encode delta texts whose base no history item holds in
+        memory any more, so no memory is held that the budget doesn't see.
+        The first one of a group is encoded on its own and becomes the base
+        of the others.
+        """
+        self._rebase_scheduled = False
+        texts = [(item, item.compressed_text()) for item in self.history]
+        held = {id(text) for _, text in texts if self._is_text_base(text)}
+        replacements = {}  # id(old base) -> new base
+        for item, text in texts:
+            if text is None or not text.is_delta or id(text.base) in held:
+                continue
+            if item.fingerprint() not in self.history or item.compressed_text() is not text:
+                continue  # changed while this task yielded
+            replacement = replacements.get(id(text.base))
+            rebased = item.rebase_text((replacement,) if replacement is not None else ())
+            if not rebased.is_delta:
+                replacements.setdefault(id(text.base), rebased)
+                self.pipeline.recent_texts.add(rebased)
+            for evicted in self.history.refresh(item):
+                self._forget(evicted)
+            yield
+
+    # ------------------------------
+    # Image compression
+    # ------------------------------
+    def _schedule_compression(self):
+        if not self._compress_scheduled:
+            self._compress_scheduled = True
+            self.scheduler.schedule(self._compress_images, priority=PRIORITY_IMAGE_COMPRESS,
+                                    name="image_compress")
+
+    def _compress_images(self):
+        """Idle task: hand one in-memory image per step to the compressor."""
+        self._compress_scheduled = False
+        for item in self.history:
+            digest = item.fingerprint()
+            image = item.raw_image()
+            if image is None or digest in self._compress_in_flight:
+                continue
+            self._compress_in_flight.add(digest)
+            self.image_compressor.request(item, image)
+            yield
+
+    def _on_image_compressed(self, item: ClipboardItemStruct, compressed: CompressedImage):
+        digest = item.fingerprint()
+        self._compress_in_flight.discard(digest)
+        demoted = digest in self._spill_on_compress
+        self._spill_on_compress.discard(digest)
+        if digest not in self.history or not item.compress(compressed):
+            return
+        if demoted:
+            self._demote(item)
+        for evicted in self.history.refresh(item):
+            self._forget(evicted)
 
+    def memory_stats(self) -> dict:
+        """Where memory goes: history by type, compressed images and texts, decoded and thumbnail caches, the disk tier."""
+        compressed = [png for png in (item.encoded_png() for item in self.history) if png is not None]
+        texts = [text for text in (item.compressed_text() for item in self.history) if text is not None]
+        return {
+            "history_items": len(self.history),
+            "history_bytes": self.history.nbytes(),
+            "history_bytes_by_type": {t: self.history.nbytes(t) for t in self.history.quotas},
+            "history_max_bytes": self.history.max_bytes,
+            "history_disk_bytes": self.history.disk_bytes(),
+            "history_max_disk_bytes": self.history.max_disk_bytes,
+            "blob_store_bytes": self.blob_store.nbytes(),
+            "compressed_images": len(compressed),
+            "compressed_bytes": sum(png.size() for png in compressed),
+            "compressed_texts": len(texts),
+            "compressed_text_deltas": sum(text.is_delta for text in texts),
+            "compressed_text_bytes": sum(text.nbytes() for text in texts),
+            "compressed_text_chars": sum(len(text) for text in texts),
+            "decoded_images": decoded_images.stats(),
+            "thumbnail_bytes": self.thumbnails.memory_bytes(),
+            "thumbnail_disk_bytes": self.thumbnails.disk_bytes(),
+        }
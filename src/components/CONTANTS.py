@@ -282,7 +282,9 @@ ICON_MAP = {
     "json": "📦",
     "xml": "🧩",
 
+    "html": "🖋️",
     "link": "🔗",
+    "url": "🔗",
     "email": "📧",
     "phone": "📱",
 
@@ -341,6 +343,7 @@ ICON_MAP = {
     # ─────────────────────────────
     # Misc Useful Types
     # ─────────────────────────────
+    "color": "🎨",
     "location": "📍",
     "calendar": "📅",
     "contact": "🧑‍💼",
@@ -1,9 +1,32 @@
 
+import hashlib
 from enum import Enum
-from datetime import datetime
-from PySide6.QtGui import  QPixmap
+from array import array
+import time
+from PySide6.QtGui import  QPixmap, QImage
 from src.components.CONTANTS import  ICON_MAP
-from PySide6.QtCore import Qt, QByteArray, QBuffer
+from PySide6.QtCore import QMimeData, QByteArray
+from src.utils.blob_store import BlobStore, SpilledText, SpilledImage
+from src.utils.html_text import scan_html, html_to_text
+from src.utils.image_codec import CompressedImage, decoded_images, encode_png
+from src.utils.text_codec import CompressedText
+from src.utils.thumbnail_cache import LIST_THUMBNAIL, scale_image
+
+# 128-bit blake2b: stable across runs, unlike the salted builtin hash()
+FINGERPRINT_SIZE = 16
+
+# Private format stamped on every write made by ClipOmnia, holds the fingerprint
+SELF_MIME_FORMAT = "application/x-clipomnia-fingerprint"
+
+# Extra formats bigger than this go to disk at capture, whatever the spill
+# threshold; with no blob store to take them they are listed but not kept
+MAX_FORMAT_BYTES = 4 * 1024 * 1024
+
+# Characters of a spilled payload kept in memory for the list and the index
+SPILL_HEAD_CHARS = 4096
+
+# Rough per-entry cost of the item object and its fields, for `nbytes`
+ITEM_OVERHEAD_BYTES = 512
 
 class ContentType(str, Enum):
     TEXT = "text"
@@ -12,63 +35,441 @@ class ContentType(str, Enum):
     URL = "url"
     FILE = "file"
     COLOR = "color"
+    JSON = "json"
+    CODE = "code"
 
 def is_real_html(html: str) -> bool:
-    h = html.lower()
+    # One tokenizer pass that stops at the first structural/semantic tag
+    return scan_html(html, max_chars=0).is_real
 
-    # real document structure
-    if "<html" in h or "<body" in h or "<head" in h:
-        return True
 
-    # semantic tags (not used by VS)
-    semantic_tags = ("<p", "<div", "<table", "<ul", "<ol", "<li", "<br")
-    if any(tag in h for tag in semantic_tags):
-        return True
+def fingerprint_image(image: QImage) -> str:
+    """Hash the raw pixel buffer of `image` without encoding it."""
+    h = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+    h.update(f"image:{image.width()}x{image.height()}:{image.format().value}".encode())
+    if image.colorCount():
+        h.update(array("I", image.colorTable()).tobytes())
+
+    view = image.constBits()  # memoryview over the QImage data, no copy
+    row_bytes = (image.width() * image.depth() + 7) // 8
+    stride = image.bytesPerLine()
+    if row_bytes == stride:
+        h.update(view[:image.sizeInBytes()])
+    else:
+        # Skip the scanline padding, its content is undefined
+        for y in range(image.height()):
+            start = y * stride
+            h.update(view[start:start + row_bytes])
+    return h.hexdigest()
+
 
-    # multiple block elements → definitely real HTML
-    if h.count("<p") > 1 or h.count("<div") > 1:
+def fingerprint_bytes(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=FINGERPRINT_SIZE).hexdigest()
+
+
+def fingerprint_urls(urls) -> str:
+    h = hashlib.blake2b(b"url:", digest_size=FINGERPRINT_SIZE)
+    for url in urls:
+        h.update(url.toEncoded().data())
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def _is_redundant_format(fmt: str, content_type: str) -> bool:
+    """True for formats Qt regenerates from the item's primary payload."""
+    if fmt == SELF_MIME_FORMAT:
         return True
+    if content_type == "image":
+        return fmt.startswith("image/") or fmt == "application/x-qt-image"
+    if content_type == "url":
+        return fmt == "text/uri-list"
+    # Text and HTML are read as strings by capture, which keeps whichever of
+    # the two is not the item's content (see `set_payload`)
+    return fmt.startswith("text/plain") or fmt == "text/html"
+
+
+class MimeBundle:
+    """
+    Every format the source application offered for one clipboard entry.
+
+    `formats` is the cheap descriptor kept for all entries. Payload bytes are
+    only pulled for formats the primary content can't regenerate; they are
+    read with the snapshot, before capture knows whether the entry is new,
+    and dropped with it when it is a duplicate.
+    """
+
+    __slots__ = ("formats", "_payloads", "_spilled")
 
-    return False
+    def __init__(self, formats, payloads=None):
+        self.formats = tuple(formats)
+        self._payloads = payloads or {}
+        self._spilled = {}  # format -> (store, key)
+
+    @classmethod
+    def capture(cls, mime: QMimeData, content_type: str) -> "MimeBundle":
+        formats = [f for f in mime.formats() if f != SELF_MIME_FORMAT]
+        payloads = {}
+        for fmt in formats:
+            if _is_redundant_format(fmt, content_type):
+                continue
+            payloads[fmt] = mime.data(fmt)  # QByteArray, implicitly shared
+        return cls(formats, payloads)
+
+    def extra_formats(self):
+        return tuple(self._payloads) + tuple(self._spilled)
+
+    def payload(self, fmt: str):
+        if fmt in self._spilled:
+            store, key = self._spilled[fmt]
+            try:
+                return QByteArray(store.read_bytes(key))
+            except OSError as e:
+                print(f"Spilled {fmt} payload unavailable: {e}")
+                return None
+        return self._payloads.get(fmt)
+
+    def set_payload(self, fmt: str, data: QByteArray):
+        self._payloads[fmt] = data
+
+    def spill(self, store: BlobStore, threshold: int):
+        """Move payloads larger than `threshold` bytes to `store`, keyed by their content."""
+        for fmt, data in list(self._payloads.items()):
+            if data.size() > threshold:
+                raw = data.data()
+                key = fingerprint_bytes(raw)
+                store.put_bytes(key, raw)
+                self._spilled[fmt] = (store, key)
+                del self._payloads[fmt]
+
+    def drop_oversized(self):
+        """Forget payloads over MAX_FORMAT_BYTES, for entries that can't spill."""
+        for fmt, data in list(self._payloads.items()):
+            if data.size() > MAX_FORMAT_BYTES:
+                del self._payloads[fmt]
+
+    def retain(self):
+        for store, key in self._spilled.values():
+            store.retain(key)
+
+    def release(self):
+        for store, key in self._spilled.values():
+            store.release(key)
+
+    def nbytes(self) -> int:
+        """Bytes held in memory (spilled payloads are not counted)."""
+        return sum(data.size() for data in self._payloads.values())
+
+    def disk_bytes(self) -> int:
+        return sum(store.size(key) for store, key in self._spilled.values())
 
 
 class ClipboardItemStruct:
-    """Represents one clipboard entry (text, image, url…)."""
+    """
+    Represents one clipboard entry (text, image, url…).
 
-    def __init__(self, content, content_type, ocr_text: str=None):
-        self.content = content
-        self.content_type = content_type
-        self.timestamp = datetime.now()
-        self.timestamp_str = self.timestamp.strftime("%H:%M:%S")
+    Slotted and cheap to build (worker threads, long histories): derived
+    fields (description, plain text, icon) are computed on first use and
+    memoized, the timestamp is a float.
+    """
+    __slots__ = (
+        "_content", "content_type", "kind", "_fingerprint", "mime_bundle", "timestamp",
+        "thumbnail", "perceptual_hash", "ocr_text", "ocr_state", "secret", "_masked_text", "_plain_text", "_description", "_icon",
+    )
 
-        self.icon = self._make_icon()
-        self.description = self._make_description()
-        self.search_text = self._make_description(make_search=True)
+    def __init__(self, content, content_type, ocr_text: str=None, fingerprint: str=None,
+                 mime_bundle: MimeBundle=None, thumbnail: QImage=None, kind: str=None,
+                 plain_text: str=None, timestamp: float=None):
+        # str / QImage / [QUrl], CompressedText / CompressedImage once compressed
+        # in memory (see `compress_text`, `compress`), or SpilledText /
+        # SpilledImage once moved to disk (see `spill`)
+        self._content = content
+        # How the content is stored and pasted back ("text", "html", "image", "url")
+        self.content_type = content_type
+        # What it is (a ContentType), set once by the capture classifier
+        self.kind = kind or content_type
+        self._fingerprint = fingerprint
+        self.mime_bundle = mime_bundle
+        self.timestamp = time.time() if timestamp is None else timestamp
+        # QImage thumbnail, safe to build on a worker thread; the QPixmap
+        # icon is only made from it on first use, on the GUI thread
+        self.thumbnail = thumbnail
+        # Images only: dHash set at capture, for near-duplicate lookups
+        self.perceptual_hash = None
         self.ocr_text = ocr_text
+        # None (no OCR requested), "pending", "done" or "failed"
+        self.ocr_state = "done" if ocr_text is not None else None
+        # Set by the secret filter: list and index only see the masked text
+        self.secret = False
+        self._masked_text = None
+        # HTML only: capped, sanitized text rendition (see `plain_text`)
+        self._plain_text = plain_text
+        self._description = None
+        self._icon = None
 
     def set_ocr_text(self, ocr_text: str):
-        # Return a new object with updated OCR text
-        return ClipboardItemStruct(
-            content=self.content,
-            content_type=self.content_type,
-            ocr_text=ocr_text
-        )
+        """Attach the OCR result in place; the item keeps its identity and thumbnail."""
+        self.ocr_text = ocr_text
+        self.ocr_state = "done"
+        self._description = None
+        return self
+
+    def set_ocr_state(self, state: str):
+        self.ocr_state = state
+        self._description = None
+
+    @property
+    def timestamp_str(self) -> str:
+        return time.strftime("%H:%M:%S", time.localtime(self.timestamp))
+
+    @property
+    def description(self) -> str:
+        if self._description is None:
+            self._description = self._make_description()
+        return self._description
+
+    @property
+    def plain_text(self):
+        """Text rendition of HTML content for search, list and preview (None otherwise)."""
+        if self._plain_text is None and self.content_type == "html":
+            content = self._content
+            self._plain_text = html_to_text(content.head if self.head_only else content)
+        return self._plain_text
+
+    def mask_secrets(self, masked_text: str):
+        """Show and index `masked_text` (capped) instead of the content."""
+        self.secret = True
+        self._masked_text = masked_text[:SPILL_HEAD_CHARS]
+        self._description = None
+
+    @property
+    def masked_text(self):
+        """What a secret item shows instead of its content (None if not a secret)."""
+        return self._masked_text
+
+    @property
+    def content(self):
+        """The full payload; a spilled payload is read back from disk."""
+        if isinstance(self._content, (CompressedImage, SpilledImage)):
+            # Decoded once and kept while in use (preview, paste, OCR)
+            try:
+                return decoded_images.get(self.fingerprint(), self._content.read)
+            except OSError as e:
+                print(f"Image content unavailable: {e}")
+                return QImage()
+        if isinstance(self._content, CompressedText):
+            return self._content.read()
+        if self.spilled:
+            try:
+                return self._content.read()
+            except OSError as e:
+                # Blob already collected (item evicted while still on the clipboard)
+                print(f"Spilled content unavailable: {e}")
+                return self._content.head
+        return self._content
+
+    @property
+    def spilled(self) -> bool:
+        return isinstance(self._content, (SpilledText, SpilledImage))
+
+    @property
+    def head_only(self) -> bool:
+        """Only the head of the text is at hand (compressed or spilled), see `matches`."""
+        return isinstance(self._content, (SpilledText, CompressedText))
+
+    @property
+    def search_text(self) -> str:
+        """Flattened searchable text; only the head of a compressed or spilled payload."""
+        return self._make_description(make_search=True)
+
+    def spill(self, store: BlobStore, threshold: int) -> bool:
+        """
+        Move text content longer than `threshold` characters (image pixels
+        and bundle payloads bigger than `threshold` bytes) to `store`.
+        Images are PNG-encoded first unless they already are: do that on a
+        worker. Thread-safe while the item is not shared yet, i.e. inside
+        the capture pipeline. Takes one reference per blob, see `release`.
+        """
+        key = self.fingerprint()
+        if self.mime_bundle is not None:
+            self.mime_bundle.spill(store, threshold)
+        if isinstance(self._content, QImage):
+            if self._content.sizeInBytes() <= threshold:
+                return False
+            # PNG on disk, raw pixels would be 10-30x bigger
+            self._content = SpilledImage.write(store, key, CompressedImage.encode(self._content))
+            return True
+        if isinstance(self._content, CompressedImage):
+            # Already encoded: the PNG goes to disk as is
+            if self._content.nbytes() <= threshold:
+                return False
+            self._content = SpilledImage.write(store, key, self._content)
+            return True
+        if isinstance(self._content, CompressedText):
+            if len(self._content) <= threshold:
+                return False
+            self._content = SpilledText.write(store, key, self._content.read(), SPILL_HEAD_CHARS)
+            return True
+        if self.spilled or not isinstance(self._content, str) or len(self._content) <= threshold:
+            return False
+        if self.content_type == "html" and self._plain_text is None:
+            # Render from the full markup while it is still in memory
+            self._plain_text = html_to_text(self._content)
+        self._content = SpilledText.write(store, key, self._content, SPILL_HEAD_CHARS)
+        self._description = None
+        return True
+
+    def compress_text(self, threshold: int, bases=()):
+        """
+        zlib-compress text content longer than `threshold` characters, as a
+        delta against one of `bases` (CompressedTexts) when it mostly
+        repeats it. Return the CompressedText, or None if left as is.
+        Thread-safe while the item is not shared yet (capture pipeline).
+        """
+        if not isinstance(self._content, str) or len(self._content) <= threshold:
+            return None
+        if self.content_type == "html" and self._plain_text is None:
+            self._plain_text = html_to_text(self._content)
+        self._content = CompressedText.encode(self._content, SPILL_HEAD_CHARS, bases)
+        self._description = None
+        return self._content
+
+    def retain(self):
+        """Keep what this item spilled to disk alive for one more holder."""
+        if self.spilled:
+            self._content.retain()
+        if self.mime_bundle is not None:
+            self.mime_bundle.retain()
+
+    def release(self):
+        """Drop this holder's reference on the spilled blobs (history, clipboard)."""
+        if self.spilled:
+            self._content.release()
+        if self.mime_bundle is not None:
+            self.mime_bundle.release()
+
+    def compress(self, compressed: CompressedImage) -> bool:
+        """Swap the in-memory QImage for its PNG encoding (GUI thread, or the pipeline before it is shared)."""
+        if not isinstance(self._content, QImage):
+            return False  # spilled meanwhile
+        self._content = compressed
+        return True
+
+    def nbytes(self) -> int:
+        """
+        Estimated bytes kept in memory: payload (one byte per character),
+        thumbnail, derived texts and bundle payloads. Spilled payloads
+        count their head only.
+        """
+        content = self._content
+        if isinstance(content, QImage):
+            size = content.sizeInBytes()
+        elif isinstance(content, str):
+            size = len(content)
+        elif isinstance(content, (CompressedImage, CompressedText)):
+            size = content.nbytes()
+        elif isinstance(content, SpilledText):
+            size = len(content.head)
+        elif isinstance(content, list):
+            size = 128 * len(content)  # QUrls
+        else:
+            size = 0
+        if self.thumbnail is not None:
+            size += self.thumbnail.sizeInBytes()
+        for text in (self._plain_text, self.ocr_text, self._masked_text):
+            if text:
+                size += len(text)
+        if self.mime_bundle is not None:
+            size += self.mime_bundle.nbytes()
+        return size + ITEM_OVERHEAD_BYTES
+
+    def disk_bytes(self) -> int:
+        """Bytes of the blobs this item spilled to disk."""
+        size = self._content.store.size(self._content.key) if self.spilled else 0
+        if self.mime_bundle is not None:
+            size += self.mime_bundle.disk_bytes()
+        return size
+
+    def content_length(self) -> int:
+        return len(self._content) if isinstance(self._content, (str, SpilledText, CompressedText)) else 0
+
+    def preview_text(self, limit: int = None) -> str:
+        """Text content, or its first `limit` characters, without loading a spilled payload whole."""
+        if self.head_only:
+            try:
+                return self._content.read(limit)
+            except OSError as e:
+                print(f"Spilled content unavailable: {e}")
+                return self._content.head if limit is None else self._content.head[:limit]
+        text = str(self._content)
+        return text if limit is None else text[:limit]
+
+    def matches(self, term: str) -> bool:
+        """Full-content search (a compressed payload is decompressed, a spilled one streamed from disk)."""
+        if self.head_only and not self.secret:
+            try:
+                return self._content.contains(term)
+            except OSError as e:
+                print(f"Spilled content unavailable: {e}")
+        return term.lower() in self.search_text.lower()
+
+    @property
+    def icon(self):
+        if self._icon is None:
+            self._icon = self._make_icon()
+        return self._icon
+
+    def raw_image(self):
+        """The uncompressed in-memory QImage, or None once compressed or spilled."""
+        return self._content if isinstance(self._content, QImage) else None
+
+    def encoded_png(self):
+        """PNG bytes of the image when it is kept compressed (no encoding needed), else None."""
+        if isinstance(self._content, CompressedImage):
+            return self._content.data
+        return None
+
+    def png_bytes(self) -> QByteArray:
+        """PNG of the image, kept, read back from disk or encoded (thread-safe, may be slow)."""
+        content = self._content
+        if isinstance(content, CompressedImage):
+            return content.data
+        if isinstance(content, SpilledImage):
+            return QByteArray(content.store.read_bytes(content.key))  # spilled as PNG
+        return encode_png(content)
+
+    def image_size(self):
+        """(width, height) of an image, without decoding it; None for other types."""
+        if self.content_type != "image":
+            return None
+        return self._content.width(), self._content.height()
+
+    def rebase_text(self, bases=()):
+        """Re-encode a delta text against `bases`, or on its own: its base is leaving memory."""
+        self._content = CompressedText.encode(self._content.read(), SPILL_HEAD_CHARS, bases)
+        return self._content
+
+    def compressed_text(self):
+        """The CompressedText content, else None (plain, spilled or not text)."""
+        if isinstance(self._content, CompressedText):
+            return self._content
+        return None
+
+    def make_thumbnail(self):
+        """Scale the image icon, thread-safe (no QPixmap involved)."""
+        if self.content_type == "image" and self.thumbnail is None:
+            self.thumbnail = scale_image(self.content, LIST_THUMBNAIL)
+        return self.thumbnail
 
     def _make_icon(self):
         if self.content_type == "image":
-            preview = self.content.scaled(
-                32, 32,
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation,
-            )
-            return QPixmap.fromImage(preview)
+            return QPixmap.fromImage(self.make_thumbnail())
 
-        return ICON_MAP.get(self.content_type, "📄")
+        return ICON_MAP.get(self.kind, ICON_MAP.get(self.content_type, "📄"))
 
 
     def _make_content_text(self):
         if self.content_type == "image":
-            return f"Image ({self.content.width()}x{self.content.height()})"
+            return f"Image ({self._content.width()}x{self._content.height()})"
 
         if self.content_type == "text":
             flat = self.content.replace("\n", " ")
@@ -80,33 +481,53 @@ class ClipboardItemStruct:
         return str(self.content)
     
     def _make_description(self, make_search=False):
+        if self._masked_text is not None:
+            flat = self._masked_text.replace("\n", " ")
+            return flat if make_search or len(flat) <= 50 else flat[:50] + "..."
+
         if self.content_type == "image":
-            return f"Image ({self.content.width()}x{self.content.height()})"
+            # Size only: a spilled image answers without loading its pixels
+            description = f"Image ({self._content.width()}x{self._content.height()})"
+            # OCR text is indexed on its own (SearchIndex.append)
+            if make_search or self.ocr_state not in ("pending", "failed"):
+                return description
+            return f"{description} · " + ("reading text…" if self.ocr_state == "pending" else "OCR failed")
 
-        if self.content_type == "text":
-            flat = self.content.replace("\n", " ")
+        if self.content_type in ("text", "html"):
+            if self.content_type == "html":
+                text, length = self.plain_text, len(self.plain_text)
+            else:
+                text = self._content.head if self.head_only else self._content
+                length = self.content_length()
             if make_search:
-                return flat
+                return text.replace("\n", " ")
             else:
-                return (flat[:50] + "...") if len(flat) > 50 else flat
+                # Slice before flattening, content can be megabytes long
+                flat = text[:50].replace("\n", " ")
+                return (flat + "...") if length > 50 else flat
             
 
         if self.content_type == "url":
             return ", ".join(u.toString() for u in self.content)
 
+        if self.head_only:
+            return self._content.head
         return str(self.content)
 
+    def fingerprint(self) -> str:
+        """Stable 128-bit content hash, computed once per item."""
+        if self._fingerprint is None:
+            if self.content_type == "image":
+                self._fingerprint = fingerprint_image(self.content)
+            elif self.content_type == "url":
+                self._fingerprint = fingerprint_urls(self.content)
+            else:
+                self._fingerprint = fingerprint_bytes(str(self.content).encode("utf-8", "surrogatepass"))
+        return self._fingerprint
+
     def digest(self):
         """Used to detect duplicates."""
-        if self.content_type == "image":
-            # Hash raw bytes
-            ba = QByteArray()
-            buffer = QBuffer(ba)
-            buffer.open(QBuffer.WriteOnly)
-            self.content.save(buffer, "PNG")  # deterministic
-            return hash(bytes(ba))
-
-        return hash(str(self.content))
+        return self.fingerprint()
 
     def __str__(self):
         return f"<ClipboardItem type={self.content_type} time={self.timestamp_str} descr={self.description}>"
@@ -0,0 +1,179 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional
+from src.components.cliboard_item_struct import ClipboardItemStruct
+
+# Share of the memory budget each content type may use
+DEFAULT_QUOTAS = {"image": 0.6, "text": 0.25, "html": 0.1, "url": 0.05}
+
+
+class ClipboardHistory:
+    """
+    Clipboard entries keyed by fingerprint, newest first.
+
+    Lookup, insert, move-to-front, remove and trimming to `max_items` are all
+    O(1); iterating yields items in recency order for the UI.
+
+    Memory is budgeted too: with `max_bytes`, each content type may keep
+    its quota (share of `max_bytes`) of resident bytes, as estimated by
+    `ClipboardItemStruct.nbytes`. Over quota, the least recently used
+    resident entries of that type are handed to `demote`, which moves what
+    it can of their payload to disk; they stay in history. Only once
+    nothing is left to demote are the oldest entries evicted.
+
+    The disk tier is budgeted as well: with `max_disk_bytes`, the least
+    recently used entries holding blobs on disk (`ClipboardItemStruct.disk_bytes`)
+    are evicted until what they hold fits.
+    """
+
+    def __init__(self, max_items: int = 50, max_bytes: int = 0, quotas: Dict[str, float] = None,
+                 demote: Callable[[ClipboardItemStruct], None] = None, max_disk_bytes: int = 0):
+        self.max_items = max_items
+        self.max_bytes = max_bytes  # 0: no byte budget
+        self.max_disk_bytes = max_disk_bytes  # 0: no disk budget
+        self.quotas = dict(DEFAULT_QUOTAS if quotas is None else quotas)
+        self.demote = demote
+        self._items: "OrderedDict[str, ClipboardItemStruct]" = OrderedDict()
+        # Per content type, fingerprint -> accounted bytes, least recent first
+        self._by_type: Dict[str, "OrderedDict[str, int]"] = {}
+        # Entries not demoted yet, same order
+        self._resident: Dict[str, "OrderedDict[str, None]"] = {}
+        self._type_bytes: Dict[str, int] = {}
+        # Fingerprint -> bytes on disk, entries holding blobs only
+        self._disk: Dict[str, int] = {}
+        self._disk_bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[ClipboardItemStruct]:
+        # Snapshot, so callers may add/remove while walking the history
+        return iter(list(self._items.values()))
+
+    def __contains__(self, key):
+        if isinstance(key, ClipboardItemStruct):
+            key = key.fingerprint()
+        return key in self._items
+
+    def get(self, fingerprint: str) -> Optional[ClipboardItemStruct]:
+        return self._items.get(fingerprint)
+
+    def add(self, item: ClipboardItemStruct) -> List[ClipboardItemStruct]:
+        """Insert (or replace) `item` at the front, return the evicted items."""
+        key = item.fingerprint()
+        self._items[key] = item
+        self._items.move_to_end(key, last=False)
+        self._account(item)
+        self._by_type[item.content_type].move_to_end(key)
+        self._resident.setdefault(item.content_type, OrderedDict())[key] = None
+        self._resident[item.content_type].move_to_end(key)
+        return self.trim()
+
+    def refresh(self, item: ClipboardItemStruct) -> List[ClipboardItemStruct]:
+        """Re-account an entry that grew in place (OCR text); return the evicted items."""
+        if item.fingerprint() not in self._items:
+            return []
+        self._account(item)
+        return self.trim()
+
+    def move_to_front(self, fingerprint: str) -> bool:
+        item = self._items.get(fingerprint)
+        if item is None:
+            return False
+        self._items.move_to_end(fingerprint, last=False)
+        self._by_type[item.content_type].move_to_end(fingerprint)
+        resident = self._resident.get(item.content_type, {})
+        if fingerprint in resident:
+            resident.move_to_end(fingerprint)
+        return True
+
+    def remove(self, fingerprint: str) -> Optional[ClipboardItemStruct]:
+        item = self._items.pop(fingerprint, None)
+        if item is not None:
+            self._unaccount(item)
+        return item
+
+    # ------------------------------
+    # Budget
+    # ------------------------------
+    def nbytes(self, content_type: str = None) -> int:
+        """Accounted resident bytes, of one content type or in total."""
+        if content_type is not None:
+            return self._type_bytes.get(content_type, 0)
+        return sum(self._type_bytes.values())
+
+    def disk_bytes(self) -> int:
+        """Accounted bytes of the blobs entries hold on disk."""
+        return self._disk_bytes
+
+    def quota(self, content_type: str) -> int:
+        # A type without a quota is only bounded by the whole budget
+        return int(self.max_bytes * self.quotas.get(content_type, 1.0))
+
+    def _account(self, item: ClipboardItemStruct):
+        key, content_type = item.fingerprint(), item.content_type
+        sizes = self._by_type.setdefault(content_type, OrderedDict())
+        old = sizes.get(key, 0)
+        sizes[key] = size = item.nbytes()  # keeps an existing entry's position
+        self._type_bytes[content_type] = self._type_bytes.get(content_type, 0) - old + size
+        disk = item.disk_bytes()
+        self._disk_bytes += disk - self._disk.get(key, 0)
+        if disk:
+            self._disk[key] = disk
+        else:
+            self._disk.pop(key, None)
+
+    def _unaccount(self, item: ClipboardItemStruct):
+        key, content_type = item.fingerprint(), item.content_type
+        self._type_bytes[content_type] -= self._by_type[content_type].pop(key, 0)
+        self._resident.get(content_type, {}).pop(key, None)
+        self._disk_bytes -= self._disk.pop(key, 0)
+
+    def trim(self) -> List[ClipboardItemStruct]:
+        """
+        Drop the oldest entries beyond `max_items`, bring each type under
+        its quota, then the disk tier under `max_disk_bytes`.
+        """
+        evicted = []
+        while len(self._items) > self.max_items:
+            _, item = self._items.popitem(last=True)
+            self._unaccount(item)
+            evicted.append(item)
+        if self.max_bytes:
+            for content_type in list(self._by_type):
+                evicted += self._trim_type(content_type)
+        if self.max_disk_bytes:
+            # Oldest first; only reached once the disk tier is full, so rare
+            for key in reversed(list(self._items)):
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                if key in self._disk:
+                    item = self._items.pop(key)
+                    self._unaccount(item)
+                    evicted.append(item)
+        return evicted
+
+    def _trim_type(self, content_type: str) -> List[ClipboardItemStruct]:
+        evicted = []
+        quota = self.quota(content_type)
+        resident = self._resident.get(content_type, OrderedDict())
+        sizes = self._by_type[content_type]
+        while self._type_bytes[content_type] > quota and sizes:
+            if resident:
+                # Disk tier first: the entry stays listed and searchable
+                key, _ = resident.popitem(last=False)
+                if self.demote is not None:
+                    self.demote(self._items[key])
+                    self._account(self._items[key])
+                continue
+            key, size = sizes.popitem(last=False)
+            self._type_bytes[content_type] -= size
+            evicted.append(self._items.pop(key))
+        return evicted
+
+    def clear(self):
+        self._items.clear()
+        self._by_type.clear()
+        self._resident.clear()
+        self._type_bytes.clear()
+        self._disk.clear()
+        self._disk_bytes = 0
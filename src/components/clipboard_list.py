@@ -1,5 +1,5 @@
 import sys
-from PySide6.QtCore import QSize
+from PySide6.QtCore import QSize, Signal
 from src.components.custom_item_widget import CustomItemWidget
 from src.components.cliboard_item_struct import ClipboardItemStruct
 from src.components.theme_manager import theme_manager, get_clipboard_list_style
@@ -7,8 +7,18 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QAbstractItemView, QLi
 
 
 class ClipboardList(QListWidget):
+    """
+    Rows for clipboard entries, one CustomItemWidget each.
+
+    `sync` brings the rows in line with a new list of entries and only
+    builds widgets for rows that are new or moved, so a capture, paste or
+    delete costs one or two widgets instead of a rebuild.
+    """
+    delete_clicked = Signal(ClipboardItemStruct)  # from any row
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._rows = {}  # fingerprint -> QListWidgetItem
         # Customize your list
         self.setStyleSheet("background-color: white; border-radius: 5px;")
         self.setObjectName("QListWidget")
@@ -31,12 +41,14 @@ class ClipboardList(QListWidget):
         item = QListWidgetItem()
         item.setSizeHint(QSize(0, 65))
         widget = CustomItemWidget(clipboardItemStruct=clip_item_struct)
+        widget.delete_clicked.connect(self.delete_clicked)
         
-        if index:
+        if index is not None:
             self.insertItem(index, item)
         else:
             self.addItem(item)
         self.setItemWidget(item, widget)
+        self._rows[clip_item_struct.fingerprint()] = item
         
         return widget
     
@@ -44,12 +56,35 @@ class ClipboardList(QListWidget):
     def remove_by_index(self, index):
         """Remove item at index."""
         if 0 <= index < self.count():
+            widget = self.itemWidget(self.item(index))
+            if widget is not None:
+                self._rows.pop(widget.clipboardItemStruct.fingerprint(), None)
             item = self.takeItem(index)
             del item
 
     def clear_items(self):
         """Clear all clipboard entries."""
         self.clear()
+        self._rows.clear()
+
+    def sync(self, clip_item_structs):
+        """Show exactly `clip_item_structs`, in order, reusing the rows already there."""
+        wanted = list(clip_item_structs)
+        keys = [item.fingerprint() for item in wanted]
+        keep = set(keys)
+        for i in reversed(range(self.count())):
+            if self.get_clip_item(i).fingerprint() not in keep:
+                self.remove_by_index(i)
+        for i, (item, key) in enumerate(zip(wanted, keys)):
+            row = self._rows.get(key)
+            if row is not None and self.row(row) == i and self.itemWidget(row).clipboardItemStruct is item:
+                continue
+            if row is not None:
+                # Moved or replaced: a row's widget can't be moved, build it again
+                self.remove_by_index(self.row(row))
+            self.add_item(item, index=i)
+        while self.count() > len(wanted):
+            self.remove_by_index(self.count() - 1)
 
     def get_clip_item(self, index):
         """Return the ClipboardItemStruct stored in this row."""
@@ -58,6 +93,15 @@ class ClipboardList(QListWidget):
             return widget.clipboardItemStruct
         return None
 
+    def update_item(self, clip_item_struct: ClipboardItemStruct):
+        """Refresh the row showing this entry, if any. Return True if found."""
+        row = self._rows.get(clip_item_struct.fingerprint())
+        if row is None:
+            return False
+        widget: CustomItemWidget = self.itemWidget(row)
+        widget.refresh()
+        return True
+
     def get_all_items(self):
         """Return a list of all ClipboardItemStructs."""
         items = []
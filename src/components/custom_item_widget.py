@@ -1,4 +1,4 @@
-from PySide6.QtGui import QIcon
+from PySide6.QtGui import QIcon, QImage, QPixmap, QPainter
 from src.utils.misc import BUTTON_ICONS
 from PySide6.QtCore import Qt, QSize, Signal
 from src.components.cliboard_item_struct import ClipboardItemStruct
@@ -11,6 +11,26 @@ class NoPropagateButton(QPushButton):
         super().mousePressEvent(event)
         event.accept()  # stop propagation to parent widgets
 
+class ThumbnailLabel(QLabel):
+    """Draws a QImage thumbnail, converted to a pixmap the first time the row is painted."""
+
+    def __init__(self, image: QImage, parent=None):
+        super().__init__(parent)
+        self._image = image
+        self._pixmap = None
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._image is None:
+            return
+        if self._pixmap is None:
+            self._pixmap = QPixmap.fromImage(self._image)
+        painter = QPainter(self)
+        painter.drawPixmap((self.width() - self._pixmap.width()) // 2,
+                           (self.height() - self._pixmap.height()) // 2,
+                           self._pixmap)
+        painter.end()
+
 class CustomItemWidget(QWidget):
     """Custom widget for QListWidgetItem with timestamp, icon, and description"""
     delete_clicked = Signal(ClipboardItemStruct)
@@ -39,16 +59,16 @@ class CustomItemWidget(QWidget):
         content_layout.setSpacing(12)
         # content_layout.setContentsMargins(1,0,1,0)
 
-        # Icon label
-        self.icon_label = QLabel()
+        # Icon label (image thumbnail or emoji fallback)
+        if self.clipboardItemStruct.content_type == "image":
+            self.icon_label = ThumbnailLabel(self.clipboardItemStruct.make_thumbnail())
+        else:
+            self.icon_label = QLabel()
         self.icon_label.setFixedSize(36, 36)
         self.icon_label.setObjectName("iconLabel")
         self.icon_label.setAlignment(Qt.AlignCenter)
 
-        # Set icon (image file or emoji fallback)
-        if self.clipboardItemStruct.content_type == "image":
-            self.icon_label.setPixmap(self.clipboardItemStruct.icon)
-        else:
+        if self.clipboardItemStruct.content_type != "image":
             self.icon_label.setText(self.clipboardItemStruct.icon)
             self.icon_label.setStyleSheet("font-size: 24px;")
             self.icon_label.setAlignment(Qt.AlignCenter)
@@ -81,6 +101,10 @@ class CustomItemWidget(QWidget):
         theme_manager.theme_changed.connect(self.apply_theme)
 
 
+    def refresh(self):
+        """Re-read the item's description after it changed in place."""
+        self.description_label.setText(self.clipboardItemStruct.description)
+
     def action_button_clicked(self):
         self.delete_clicked.emit(self.clipboardItemStruct)
 
@@ -94,7 +94,7 @@ class Preview(QWidget):
     # ------------------------------
     # Swap back to text
     # ------------------------------
-    def swap_to_text(self, text: str = ""):
+    def swap_to_text(self, text: str = "", plain: bool = False):
         # Remove old widget
         self.pixmap = None
         self.content_layout.removeWidget(self.text_edit_area)
@@ -103,7 +103,11 @@ class Preview(QWidget):
         # Create QTextEdit
         self.text_edit_area = QTextEdit()
         self.text_edit_area.setObjectName("previewContentText")
-        self.text_edit_area.setText(text)
+        if plain:
+            # No rich-text sniffing or layout of markup
+            self.text_edit_area.setPlainText(text)
+        else:
+            self.text_edit_area.setText(text)
 
         # Add QTextEdit to layout
         self.content_layout.addWidget(self.text_edit_area)
@@ -108,6 +108,8 @@ class AppLayout(QMainWindow):
             search_text = self.search_term
 
         self.search_term = search_text
+        # Typing in the search bar: keep deferred work out of the way
+        self.clipboard_manager.scheduler.notify_activity()
         self.list_widget.clear_items()
         for item in self.clipboard_manager.history:
             desc_text:str = item.search_text
@@ -0,0 +1,53 @@
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class AdaptivePoller(QObject):
+    """
+    Single-shot timer that backs off while nothing happens and
+    snaps back to its fastest interval after activity.
+
+    Every idle tick multiplies the interval by `backoff` up to `max_interval`;
+    calling `notify_activity()` resets it to `min_interval`.
+    """
+    timeout = Signal()
+
+    def __init__(self, min_interval=300, max_interval=3000, backoff=1.5, parent=None):
+        super().__init__(parent)
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.backoff = backoff
+        self._interval = min_interval
+        self._running = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def isActive(self):
+        return self._running
+
+    def start(self):
+        self._running = True
+        self._interval = self.min_interval
+        self._timer.start(self._interval)
+
+    def stop(self):
+        self._running = False
+        self._timer.stop()
+
+    def notify_activity(self):
+        """Something changed: poll at full speed again."""
+        self._interval = self.min_interval
+        if self._running and self._timer.isActive():
+            self._timer.start(self._interval)
+
+    def _on_timeout(self):
+        # Back off first, the handler may reset us through notify_activity()
+        self._interval = min(int(self._interval * self.backoff), self.max_interval)
+        self.timeout.emit()
+        if self._running:
+            self._timer.start(self._interval)
@@ -0,0 +1,288 @@
+import os
+import zlib
+import codecs
+import shutil
+import threading
+from PySide6.QtGui import QImage
+
+# Characters encoded / decoded per write or read when streaming text
+TEXT_CHUNK = 1024 * 1024
+# Text blobs are one zlib stream, at the fast level
+TEXT_ZLIB_LEVEL = 1
+
+
+def encoded_key(key: str, encoding: str) -> str:
+    """
+    Blob key for `key`'s content stored in `encoding`. Raw payloads
+    (`put_bytes`) use content keys as they are; the same bytes stored
+    compressed or as pixels must not land on the same file.
+    """
+    return f"{key}.{encoding}"
+
+
+class BlobStore:
+    """
+    Content-addressed directory of payloads spilled out of memory.
+
+    Keys are content fingerprints, so a payload stored twice is written
+    once. Every `put_*` takes a reference on its key, `release` drops one;
+    unreferenced blobs are only deleted by `collect`, so a payload copied
+    again before then is not rewritten. Files are written to a temporary
+    name and renamed into place, a reader never sees a partial blob.
+    Safe to use from worker threads.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._refs = {}
+        self._garbage = set()
+        self._sizes = {}  # key -> bytes on disk, for blobs written by this run
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def size(self, key: str) -> int:
+        size = self._sizes.get(key)
+        if size is not None:
+            return size
+        try:
+            return os.path.getsize(self.path(key))
+        except OSError:
+            return 0
+
+    def nbytes(self) -> int:
+        """Bytes on disk, garbage not collected yet included."""
+        return sum(self._sizes.values())
+
+    # ------------------------------
+    # Writing
+    # ------------------------------
+    def _write(self, key: str, chunks):
+        path = self.path(key)
+        with self._lock:
+            self._refs[key] = self._refs.get(key, 0) + 1
+            self._garbage.discard(key)
+            if os.path.exists(path):
+                return path  # same key, same content
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._sizes[key] = size
+        return path
+
+    def put_bytes(self, key: str, data) -> str:
+        return self._write(key, (data,))
+
+    def put_text(self, key: str, text: str) -> str:
+        """Stream `text` to disk as compressed UTF-8 without building one big bytes copy."""
+        def chunks():
+            compressor = zlib.compressobj(TEXT_ZLIB_LEVEL)
+            for i in range(0, len(text), TEXT_CHUNK):
+                yield compressor.compress(text[i:i + TEXT_CHUNK].encode("utf-8", "surrogatepass"))
+            yield compressor.flush()
+        return self._write(key, chunks())
+
+    # ------------------------------
+    # Reading
+    # ------------------------------
+    def read_bytes(self, key: str) -> bytes:
+        with open(self.path(key), "rb") as f:
+            return f.read()
+
+    def iter_text(self, key: str, chunk_bytes: int = TEXT_CHUNK):
+        """Text of a `put_text` blob, decompressed and decoded chunk by chunk; OSError if unreadable."""
+        try:
+            yield from self._iter_text(key, chunk_bytes)
+        except zlib.error as e:
+            raise OSError(f"{key}: corrupt text blob: {e}") from e
+
+    def _iter_text(self, key: str, chunk_bytes: int):
+        decompressor = zlib.decompressobj()
+        decoder = codecs.getincrementaldecoder("utf-8")("surrogatepass")
+        with open(self.path(key), "rb") as f:
+            while True:
+                data = f.read(chunk_bytes)
+                if not data:
+                    break
+                # Bounded output per step, a small chunk can inflate a lot
+                data = decompressor.decompress(data, chunk_bytes)
+                while data:
+                    yield decoder.decode(data)
+                    data = decompressor.decompress(decompressor.unconsumed_tail, chunk_bytes)
+        tail = decoder.decode(decompressor.flush(), final=True)
+        if tail:
+            yield tail
+
+    def read_text(self, key: str, limit: int = None) -> str:
+        """Whole text, or roughly the first `limit` characters of it."""
+        if limit is None:
+            try:
+                return zlib.decompress(self.read_bytes(key)).decode("utf-8", "surrogatepass")
+            except zlib.error as e:
+                raise OSError(f"{key}: corrupt text blob: {e}") from e
+        parts, size = [], 0
+        for chunk in self.iter_text(key, chunk_bytes=min(TEXT_CHUNK, limit * 4)):
+            parts.append(chunk)
+            size += len(chunk)
+            if size >= limit:
+                break
+        return "".join(parts)[:limit]
+
+    def read_image(self, key: str) -> QImage:
+        """Decode a PNG image blob; OSError if unreadable."""
+        image = QImage.fromData(self.read_bytes(key), "PNG")
+        if image.isNull():
+            raise OSError(f"{key}: not a PNG image blob")
+        return image
+
+    def search_text(self, key: str, term: str) -> bool:
+        """
+        Substring search, streamed chunk by chunk. Matches like SearchIndex:
+        case-insensitive, newlines read as spaces.
+        """
+        term = term.lower()
+        overlap = ""
+        for chunk in self.iter_text(key):
+            window = overlap + chunk.replace("\n", " ").lower()
+            if term in window:
+                return True
+            overlap = window[-(len(term) - 1):] if len(term) > 1 else ""
+        return False
+
+    # ------------------------------
+    # References and removal
+    # ------------------------------
+    def retain(self, key: str):
+        with self._lock:
+            self._refs[key] = self._refs.get(key, 0) + 1
+            self._garbage.discard(key)
+
+    def release(self, key: str):
+        """Drop one reference; the blob becomes garbage when none are left."""
+        with self._lock:
+            count = self._refs.get(key, 0) - 1
+            if count > 0:
+                self._refs[key] = count
+                return
+            self._refs.pop(key, None)
+            self._garbage.add(key)
+
+    def refcount(self, key: str) -> int:
+        return self._refs.get(key, 0)
+
+    def has_garbage(self) -> bool:
+        return bool(self._garbage)
+
+    def collect(self):
+        """Generator (idle task): delete blobs nothing references any more."""
+        with self._lock:
+            keys, self._garbage = self._garbage, set()
+        for key in keys:
+            with self._lock:
+                # Under the lock: a concurrent put of the same key either
+                # retained it first or writes it again after
+                if not self._refs.get(key):
+                    self.delete(key)
+                    self._sizes.pop(key, None)
+            yield
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def purge(self):
+        """Drop every blob (history is in memory only, old blobs are orphans)."""
+        with self._lock:
+            self._refs.clear()
+            self._garbage.clear()
+            self._sizes.clear()
+            shutil.rmtree(self.root, ignore_errors=True)
+            os.makedirs(self.root, exist_ok=True)
+
+
+class SpilledText:
+    """
+    Text kept on disk, with only a head snippet and the length in memory.
+
+    Stands in for the `str` content of an oversized clipboard item.
+    """
+    __slots__ = ("store", "key", "head", "length")
+
+    def __init__(self, store: BlobStore, key: str, head: str, length: int):
+        self.store = store
+        self.key = key
+        self.head = head
+        self.length = length
+
+    @classmethod
+    def write(cls, store: BlobStore, key: str, text: str, head_chars: int) -> "SpilledText":
+        key = encoded_key(key, "zt")
+        store.put_text(key, text)
+        return cls(store, key, text[:head_chars], len(text))
+
+    def __len__(self):
+        return self.length
+
+    def read(self, limit: int = None) -> str:
+        if limit is not None and limit <= len(self.head):
+            return self.head[:limit]
+        return self.store.read_text(self.key, limit)
+
+    def contains(self, term: str) -> bool:
+        return self.store.search_text(self.key, term)
+
+    def retain(self):
+        self.store.retain(self.key)
+
+    def release(self):
+        self.store.release(self.key)
+
+
+class SpilledImage:
+    """
+    Image kept on disk PNG-encoded, with only its size in memory.
+
+    Stands in for the QImage content of a clipboard item; `width()` and
+    `height()` answer like QImage's, `read()` decodes.
+    """
+    __slots__ = ("store", "key", "_width", "_height")
+
+    def __init__(self, store: BlobStore, key: str, width: int, height: int):
+        self.store = store
+        self.key = key
+        self._width = width
+        self._height = height
+
+    @classmethod
+    def write(cls, store: BlobStore, key: str, image) -> "SpilledImage":
+        """Store a PNG-encoded image (a CompressedImage) as it is."""
+        key = encoded_key(key, "png")
+        store.put_bytes(key, image.data.data())
+        return cls(store, key, image.width(), image.height())
+
+    def width(self) -> int:
+        return self._width
+
+    def height(self) -> int:
+        return self._height
+
+    def read(self) -> QImage:
+        return self.store.read_image(self.key)
+
+    def retain(self):
+        self.store.retain(self.key)
+
+    def release(self):
+        self.store.release(self.key)
@@ -0,0 +1,323 @@
+import traceback
+from collections import deque
+from PySide6.QtGui import QImage
+from PySide6.QtCore import (QObject, QThreadPool, Signal, QBuffer, QByteArray, QIODevice,
+                            QMimeData, QCoreApplication)
+from src.utils.search_index import SearchIndex
+from src.utils.content_classifier import classify
+from src.utils.html_text import scan_html
+from src.utils.secret_filter import MASK
+from src.utils.thumbnail_cache import LIST_THUMBNAIL, PREVIEW_THUMBNAIL
+from src.utils.image_codec import normalize_image, CompressedImage
+from src.utils.text_codec import RecentTexts
+from src.utils.image_hash import dhash
+from src.components.cliboard_item_struct import ClipboardItemStruct, MimeBundle, SPILL_HEAD_CHARS, MAX_FORMAT_BYTES
+
+
+class ClipboardSnapshot:
+    """
+    Raw clipboard payloads, read on the GUI thread and processed off it.
+
+    Clipboard access is GUI-thread only, so this is the one part of capture
+    that can't move to the pool: plain reads, no decoding and no hashing.
+    Backends whose reads block (`ClipboardBackend.reads_block`) are read on
+    the pool instead, see `CapturePipeline.submit`.
+    """
+
+    def __init__(self, mode, kind, payload, text=None, mime_bundle=None, want_ocr=False, concealed=False):
+        self.mode = mode
+        self.kind = kind          # "image" | "url" | "html" | "text"
+        self.payload = payload    # QImage / encoded image bytes / [QUrl] / str
+        self.text = text          # text/plain fallback offered with HTML
+        self.mime_bundle = mime_bundle
+        self.want_ocr = want_ocr
+        self.concealed = concealed  # the source flagged the copy as a password
+
+    @classmethod
+    def read(cls, mime: QMimeData, mode, want_ocr=False, concealed=False):
+        """Return None when the clipboard holds nothing we capture."""
+        formats = mime.formats()
+        if mime.hasImage():
+            # Prefer the encoded bytes: decoding then happens on the worker
+            raw = "image/png" if "image/png" in formats else None
+            payload = mime.data(raw) if raw else mime.imageData()
+            return cls(mode, "image", payload, mime_bundle=MimeBundle.capture(mime, "image"),
+                       want_ocr=want_ocr and not concealed, concealed=concealed)
+        if mime.hasUrls():
+            return cls(mode, "url", mime.urls(), mime_bundle=MimeBundle.capture(mime, "url"), concealed=concealed)
+        if mime.hasHtml():
+            return cls(mode, "html", mime.html(), text=mime.text(), mime_bundle=MimeBundle.capture(mime, "html"),
+                       concealed=concealed)
+        if mime.hasText():
+            return cls(mode, "text", mime.text(), mime_bundle=MimeBundle.capture(mime, "text"), concealed=concealed)
+        return None
+
+
+class CaptureResult:
+    def __init__(self, mode, item=None, search_text="", ocr_payload=None, duplicate=False, secret=False):
+        self.mode = mode
+        self.item = item  # None when a secret was kept out of history
+        self.secret = secret
+        self.search_text = search_text
+        self.ocr_payload = ocr_payload
+        self.duplicate = duplicate
+
+
+# ------------------------------
+# Stages (run on worker threads)
+# ------------------------------
+def stage_classify(snapshot: ClipboardSnapshot) -> ClipboardItemStruct:
+    item = _build_item(snapshot)
+    # Cached on the item, nothing downstream rescans the content for its type
+    item.kind = classify(item).value
+    return item
+
+
+def _build_item(snapshot: ClipboardSnapshot) -> ClipboardItemStruct:
+    bundle = snapshot.mime_bundle
+    if snapshot.kind == "image":
+        image = snapshot.payload
+        if not isinstance(image, QImage):
+            image = QImage.fromData(image)
+        # Canonical compact pixels: everything downstream (fingerprint,
+        # thumbnails, OCR upload, spill, compression) works on them
+        return ClipboardItemStruct(normalize_image(image), "image", mime_bundle=bundle)
+
+    if snapshot.kind == "url":
+        return ClipboardItemStruct(snapshot.payload, "url", mime_bundle=bundle)
+
+    if snapshot.kind == "html":
+        html, text = snapshot.payload, snapshot.text or ""
+        # One tokenizer pass both classifies the markup and renders its text
+        scan = scan_html(html)
+        if scan.is_real:
+            if text and bundle is not None:
+                bundle.set_payload("text/plain", QByteArray(text.encode()))
+            return ClipboardItemStruct(html, "html", mime_bundle=bundle, plain_text=scan.text)
+        # Editor-style HTML wrapping plain text: keep the markup as a format
+        if bundle is not None:
+            bundle.set_payload("text/html", QByteArray(html.encode()))
+        return ClipboardItemStruct(text, "text", mime_bundle=bundle)
+
+    return ClipboardItemStruct(snapshot.payload, "text", mime_bundle=bundle)
+
+
+def stage_secrets(item: ClipboardItemStruct, concealed: bool, secret_filter, policy: str) -> bool:
+    """Return True if the item holds a secret; mask it unless it is to be skipped."""
+    if secret_filter is None or policy == "off":
+        return False
+    if concealed:
+        masked = MASK
+    elif item.content_type in ("text", "html"):
+        text = item.plain_text if item.content_type == "html" else item.content
+        matches = secret_filter.scan(text)
+        if not matches:
+            return False
+        # Only the displayed head is masked, never cut a secret in half
+        head = [match for match in matches if match.start < SPILL_HEAD_CHARS]
+        end = max([SPILL_HEAD_CHARS] + [match.end for match in head])
+        masked = secret_filter.mask(text[:end], head)
+    else:
+        return False
+    if policy != "skip":
+        item.mask_secrets(masked)
+    return True
+
+
+def stage_fingerprint(item: ClipboardItemStruct) -> str:
+    return item.fingerprint()
+
+
+def stage_dedupe(fingerprint: str, is_known) -> bool:
+    return is_known(fingerprint)
+
+
+def stage_thumbnail(item: ClipboardItemStruct, thumbnails=None):
+    """List and preview thumbnails, read back from the cache for images seen before; return the preview."""
+    if item.content_type != "image":
+        return None
+    if thumbnails is None:
+        item.make_thumbnail()
+        return None
+    fingerprint = item.fingerprint()
+    persist = not item.secret
+    # The list icon is scaled from the preview one, not from the full image
+    preview = thumbnails.get_or_create(fingerprint, PREVIEW_THUMBNAIL, item.content, persist)
+    item.thumbnail = thumbnails.get_or_create(fingerprint, LIST_THUMBNAIL, preview, persist)
+    return preview
+
+
+def stage_perceptual_hash(item: ClipboardItemStruct, preview: QImage = None):
+    """dHash of an image, from its preview thumbnail when there is one (cheaper to scale)."""
+    if item.content_type == "image":
+        item.perceptual_hash = dhash(preview if preview is not None else item.content)
+
+
+def stage_encode(item: ClipboardItemStruct, store, threshold: int):
+    """PNG-encode an image that is going to disk: the blob is the PNG, and the OCR upload reuses it."""
+    image = item.raw_image()
+    if image is None or store is None or threshold <= 0 or item.secret or image.sizeInBytes() <= threshold:
+        return
+    item.compress(CompressedImage.encode(image))
+
+
+def stage_spill(item: ClipboardItemStruct, store, threshold: int):
+    """Move an oversized payload to disk before anything else copies it."""
+    bundle = item.mime_bundle
+    # Secrets never go to disk
+    if store is None or item.secret:
+        if bundle is not None:
+            bundle.drop_oversized()
+        return
+    if threshold > 0:
+        item.spill(store, threshold)
+    if bundle is not None:
+        # Huge extra formats go to disk even with spilling off
+        bundle.spill(store, MAX_FORMAT_BYTES)
+
+
+def stage_compress(item: ClipboardItemStruct, threshold: int, recent: RecentTexts = None):
+    """zlib-compress long text still in memory, as a delta against a recent one if close."""
+    if threshold <= 0 or item.secret or item.content_type not in ("text", "html"):
+        return
+    compressed = item.compress_text(threshold, recent.snapshot() if recent is not None else ())
+    if compressed is not None and recent is not None:
+        recent.add(compressed)
+
+
+def stage_index(item: ClipboardItemStruct) -> str:
+    return SearchIndex.normalize(item.search_text)
+
+
+def stage_enrich(item: ClipboardItemStruct, want_ocr: bool):
+    """Encode the OCR upload here so OCRClient doesn't do it on the GUI thread."""
+    if not want_ocr or item.content_type != "image":
+        return None
+    png = item.encoded_png()
+    if png is not None:
+        return png
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    item.content.save(buffer, "PNG")
+    return buffer.data()
+
+
+def run_stages(snapshot: ClipboardSnapshot, is_known, store=None, spill_threshold=0,
+               secret_filter=None, secret_policy="skip", thumbnails=None,
+               compress_threshold=0, recent_texts=None) -> CaptureResult:
+    item = stage_classify(snapshot)
+    if stage_secrets(item, snapshot.concealed, secret_filter, secret_policy) and secret_policy == "skip":
+        return CaptureResult(snapshot.mode, secret=True)
+    fingerprint = stage_fingerprint(item)
+    if stage_dedupe(fingerprint, is_known):
+        return CaptureResult(snapshot.mode, item, duplicate=True)
+    preview = stage_thumbnail(item, thumbnails)
+    stage_perceptual_hash(item, preview)
+    stage_encode(item, store, spill_threshold)
+    # Before spill: the OCR upload is encoded from what is still in memory
+    ocr_payload = stage_enrich(item, snapshot.want_ocr)
+    stage_spill(item, store, spill_threshold)
+    stage_compress(item, compress_threshold, recent_texts)
+    search_text = stage_index(item)
+    return CaptureResult(snapshot.mode, item, search_text, ocr_payload)
+
+
+class CapturePipeline(QObject):
+    """
+    Runs capture stages (classify, secrets, fingerprint, dedupe, thumbnail,
+    perceptual hash, encode, enrich, spill, compress, index) on a thread pool and hands results back on the GUI thread.
+
+    At most `max_workers` snapshots are processed at once and `max_pending`
+    wait behind them; when the queue is full the oldest waiting snapshot is
+    dropped, it has been superseded anyway. Results are delivered through
+    `captured` in submission order.
+
+    With a `store`, text payloads longer than `spill_threshold` characters
+    are written to it and only their head stays in memory; images whose
+    pixels take more than `spill_threshold` bytes are PNG-encoded, and
+    keep only their size if the PNG is still that big. Text
+    left in memory that is longer than `compress_threshold` characters is
+    kept zlib-compressed, as a delta against one of the last few texts
+    (`recent_texts`) when it mostly repeats it. With a
+    `secret_filter`, secrets are dropped (policy "skip") or masked. With
+    a ThumbnailCache, image thumbnails are looked up before being scaled.
+    """
+    captured = Signal(object)  # CaptureResult
+    _finished = Signal(int, object)
+
+    def __init__(self, is_known, max_workers=2, max_pending=4, store=None, spill_threshold=0,
+                 secret_filter=None, secret_policy="skip", thumbnails=None, compress_threshold=0,
+                 parent=None):
+        super().__init__(parent)
+        self._is_known = is_known
+        self.store = store
+        self.spill_threshold = spill_threshold
+        self.secret_filter = secret_filter
+        self.secret_policy = secret_policy
+        self.thumbnails = thumbnails
+        self.compress_threshold = compress_threshold
+        self.recent_texts = RecentTexts()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_workers)
+        self._max_workers = max_workers
+        self._pending = deque()
+        self._max_pending = max_pending
+        self._in_flight = 0
+        self._next_seq = 0
+        self._next_commit = 0
+        self._done = {}
+        # Cross-thread emit: queued onto this object's (GUI) thread
+        self._finished.connect(self._on_finished)
+
+    def submit(self, snapshot):
+        """
+        Queue a ClipboardSnapshot, or a callable that reads one on the worker
+        (or returns None when there is nothing to capture).
+        """
+        seq = self._next_seq
+        self._next_seq += 1
+        if self._in_flight < self._max_workers:
+            self._start(seq, snapshot)
+            return
+        if len(self._pending) >= self._max_pending:
+            dropped_seq, _ = self._pending.popleft()
+            self._done[dropped_seq] = None
+        self._pending.append((seq, snapshot))
+
+    def wait_for_done(self, msecs=-1):
+        """Block until the pool is idle and deliver what it produced (tests, benchmarks)."""
+        while self._in_flight:
+            self._pool.waitForDone(msecs)
+            QCoreApplication.processEvents()
+
+    def _start(self, seq, snapshot):
+        self._in_flight += 1
+        self._pool.start(lambda: self._run(seq, snapshot))
+
+    def _run(self, seq, snapshot):
+        # Worker thread
+        try:
+            if callable(snapshot):
+                snapshot = snapshot()
+            if snapshot is None:
+                self._finished.emit(seq, None)
+                return
+            result = run_stages(snapshot, self._is_known, self.store, self.spill_threshold,
+                                self.secret_filter, self.secret_policy, self.thumbnails,
+                                self.compress_threshold, self.recent_texts)
+        except Exception:
+            traceback.print_exc()
+            result = None
+        self._finished.emit(seq, result)
+
+    def _on_finished(self, seq, result):
+        # GUI thread
+        self._in_flight -= 1
+        self._done[seq] = result
+        while self._next_commit in self._done:
+            ready = self._done.pop(self._next_commit)
+            self._next_commit += 1
+            if ready is not None:
+                self.captured.emit(ready)
+        while self._pending and self._in_flight < self._max_workers:
+            self._start(*self._pending.popleft())
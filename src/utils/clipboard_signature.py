@@ -0,0 +1,95 @@
+import sys
+import ctypes
+import ctypes.util
+import hashlib
+from PySide6.QtCore import QMimeData
+
+# Formats whose raw bytes are cheap to read, in preference order.
+# Images are probed through their encoded bytes so nothing gets decoded;
+# "application/x-qt-image" is left out on purpose, reading it converts.
+_PROBE_FORMATS = (
+    "text/uri-list",
+    "image/png",
+    "text/html",
+    "text/plain",
+)
+
+
+def _payload_hash(data) -> bytes:
+    # The whole payload: `mime.data` has transferred it all already, and a
+    # sample would miss same-length edits between the sampled windows
+    return hashlib.blake2b(memoryview(data), digest_size=16).digest()
+
+
+class _MacPasteboard:
+    """NSPasteboard.generalPasteboard.changeCount through the objc runtime."""
+
+    def __init__(self):
+        objc = ctypes.cdll.LoadLibrary(ctypes.util.find_library("objc"))
+        ctypes.cdll.LoadLibrary("/System/Library/Frameworks/AppKit.framework/AppKit")
+        objc.objc_getClass.restype = ctypes.c_void_p
+        objc.objc_getClass.argtypes = [ctypes.c_char_p]
+        objc.sel_registerName.restype = ctypes.c_void_p
+        objc.sel_registerName.argtypes = [ctypes.c_char_p]
+        objc.objc_msgSend.restype = ctypes.c_void_p
+        objc.objc_msgSend.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+
+        self._send = objc.objc_msgSend
+        self._sel_change_count = objc.sel_registerName(b"changeCount")
+        pasteboard_cls = objc.objc_getClass(b"NSPasteboard")
+        self._pasteboard = self._send(pasteboard_cls, objc.sel_registerName(b"generalPasteboard"))
+
+    def change_count(self):
+        return self._send(self._pasteboard, self._sel_change_count)
+
+
+def _load_sequence_source():
+    """Return a callable giving the OS clipboard sequence number, if any."""
+    try:
+        if sys.platform == "win32":
+            return ctypes.windll.user32.GetClipboardSequenceNumber
+        if sys.platform == "darwin":
+            return _MacPasteboard().change_count
+    except (OSError, AttributeError, TypeError) as e:
+        print(f"Clipboard sequence number unavailable: {e}")
+    return None
+
+
+_sequence_source = _load_sequence_source()
+
+
+def os_sequence_number():
+    """Current system clipboard sequence number, or None if the OS has none."""
+    if _sequence_source is None:
+        return None
+    return _sequence_source()
+
+
+def _probe_format(formats):
+    for fmt in _PROBE_FORMATS:
+        if fmt in formats:
+            return fmt
+    for fmt in formats:
+        if fmt.startswith("image/"):
+            return fmt
+    return None
+
+
+def clipboard_signature(mime: QMimeData, sequence=None):
+    """
+    Cheap token that changes whenever the clipboard content changes.
+
+    Uses the backend's sequence number when it has one (Windows, macOS),
+    otherwise the offered format list plus a hash of one raw payload.
+    Nothing is decoded, so an unchanged clipboard costs almost nothing to
+    check. Returns None when no cheap probe exists and the caller has to look.
+    """
+    if sequence is not None:
+        return ("seq", sequence)
+
+    formats = tuple(mime.formats())
+    fmt = _probe_format(formats)
+    if fmt is None:
+        return None
+    data = mime.data(fmt)
+    return (formats, fmt, data.size(), _payload_hash(data))
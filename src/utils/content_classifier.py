@@ -0,0 +1,99 @@
+import re
+import json
+from src.components.cliboard_item_struct import ClipboardItemStruct, ContentType
+
+# Longest text still checked as a single value (a color, a URL, a path)
+MAX_VALUE_CHARS = 4096
+# Characters scanned for structure (markup, code); enough to decide
+SCAN_CHARS = 64 * 1024
+# Largest text confirmed as JSON by actually parsing it
+MAX_JSON_PARSE_CHARS = 1024 * 1024
+
+# The whole (stripped) text is one value, used with fullmatch
+_VALUE_RE = re.compile(r"""
+    (?P<color>
+        \#(?:[0-9a-f]{8}|[0-9a-f]{6}|[0-9a-f]{3,4})
+      | (?:rgba?|hsla?)\(\s*[-\d.%]+(?:\s*[,/\s]\s*[-\d.%]+){2,3}\s*\)
+    )
+  | (?P<url>(?:https?|ftp)://\S+|mailto:\S+@\S+|www\.[^\s/]+\.\S+)
+  | (?P<file>
+        file://\S+
+      | (?:~|\.{1,2})?/(?![/*\s])[^\0\n]*
+      | [a-z]:[\\/][^\0\n]*
+      | \\\\[^\\\s]+\\[^\0\n]*
+    )
+""", re.IGNORECASE | re.VERBOSE)
+
+_JSON_START_RE = re.compile(r'\s*(?:\{\s*(?:"|\})|\[\s*(?:[-"\d\[\]{]|true|false|null))')
+
+# Structural markers, counted in one pass over the head of the text
+_MARKER_RE = re.compile(r"""
+    (?P<nl>\n)
+  | (?P<html></?(?:html|body|head|p|div|table|ul|ol|li|br|span|a\s)[^>]{0,200}>)
+  | (?P<code>
+        ^[ \t]*(?:def|class|import|from|function|const|let|var|return|if|elif|for|while|
+                 switch|case|public|private|protected|static|package|fn|func|struct|
+                 enum|interface|\#include|\#define|using|namespace|SELECT|INSERT|UPDATE|
+                 DELETE|CREATE)\b
+      | [;{}][ \t]*$
+      | =>|::|->|\)[ \t]*\{|==|!=|&&|\|\|
+    )
+""", re.MULTILINE | re.VERBOSE)
+
+
+def classify_text(text: str) -> ContentType:
+    """Kind of a plain-text payload, from one scan of (at most) its head."""
+    # Only short texts are stripped whole, the rest is looked at by its ends
+    if len(text) <= MAX_VALUE_CHARS:
+        match = _VALUE_RE.fullmatch(text.strip())
+        if match:
+            if match.group("color"):
+                return ContentType.COLOR
+            if match.group("url"):
+                return ContentType.URL
+            return ContentType.FILE
+
+    tail = text[-256:].rstrip()
+    if not tail:
+        return ContentType.TEXT
+
+    if tail[-1] in "]}" and _JSON_START_RE.match(text):
+        if len(text) > MAX_JSON_PARSE_CHARS:
+            return ContentType.JSON  # too big to confirm, the shape is enough
+        try:
+            json.loads(text)
+            return ContentType.JSON
+        except ValueError:
+            pass
+
+    lines, html, code = 1, 0, 0
+    for match in _MARKER_RE.finditer(text, 0, SCAN_CHARS):
+        group = match.lastgroup
+        if group == "nl":
+            lines += 1
+        elif group == "html":
+            html += 1
+        else:
+            code += 1
+    if html >= 2:
+        return ContentType.HTML
+    if code >= 2 and code * 4 >= lines:
+        return ContentType.CODE
+    return ContentType.TEXT
+
+
+def classify_urls(urls) -> ContentType:
+    if urls and all(url.isLocalFile() for url in urls):
+        return ContentType.FILE
+    return ContentType.URL
+
+
+def classify(item: ClipboardItemStruct) -> ContentType:
+    """What `item` holds, finer than its storage `content_type`."""
+    if item.content_type == "image":
+        return ContentType.IMAGE
+    if item.content_type == "url":
+        return classify_urls(item.content)
+    if item.content_type == "html":
+        return ContentType.HTML
+    return classify_text(item.preview_text(SCAN_CHARS) if item.head_only else item.content)
@@ -0,0 +1,53 @@
+import traceback
+from PySide6.QtCore import QObject, QThreadPool, Signal
+
+
+class ContentSearch(QObject):
+    """
+    Full-content search of items only partly in memory (spilled to disk or
+    compressed), on a worker thread.
+
+    `request(term, items)` returns at once; `found` is emitted on the GUI
+    thread with the term and the matching items, in the order given. A
+    newer request (or `cancel`) stops the running scan at the next item,
+    and only the latest one is delivered.
+    """
+    found = Signal(str, object)  # term, [ClipboardItemStruct]
+    _finished = Signal(int, str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._latest = 0
+        self._finished.connect(self._on_finished)
+
+    def request(self, term: str, items):
+        self._latest += 1
+        ticket = self._latest
+        items = list(items)
+        self._pool.start(lambda: self._run(ticket, term, items))
+
+    def cancel(self):
+        self._latest += 1
+
+    def _run(self, ticket, term, items):
+        # Worker thread
+        matches = []
+        try:
+            for item in items:
+                if ticket != self._latest:
+                    return  # superseded, don't finish a stale scan
+                if item.matches(term):
+                    matches.append(item)
+        except Exception:
+            traceback.print_exc()
+        self._finished.emit(ticket, term, matches)
+
+    def _on_finished(self, ticket, term, matches):
+        # GUI thread
+        if ticket == self._latest:
+            self.found.emit(term, matches)
+
+    def wait_for_done(self):
+        self._pool.waitForDone()
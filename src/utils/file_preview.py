@@ -0,0 +1,183 @@
+import os
+import mmap
+import codecs
+import threading
+import traceback
+from collections import OrderedDict
+from PySide6.QtGui import QImageReader
+from PySide6.QtCore import QObject, QThreadPool, Signal, QSize, Qt
+
+# Bytes of a file ever read for its preview, whatever its size
+MAX_HEAD_BYTES = 64 * 1024
+# Image files bigger than this are not decoded for a thumbnail
+MAX_IMAGE_BYTES = 64 * 1024 * 1024
+THUMBNAIL_SIZE = QSize(512, 512)
+# Entries listed for a directory
+MAX_DIR_ENTRIES = 200
+
+_IMAGE_MAGIC = (
+    b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a", b"BM",
+    b"II*\x00", b"MM\x00*",
+)
+
+
+def _looks_like_image(head: bytes) -> bool:
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return True
+    return head.startswith(_IMAGE_MAGIC)
+
+
+def _looks_binary(head: bytes) -> bool:
+    if b"\x00" in head:
+        return True
+    try:
+        # A multi-byte character may be cut at the end of the head
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return False
+    except UnicodeDecodeError:
+        pass
+    # Not UTF-8: legacy 8-bit text still has few control bytes
+    control = sum(1 for b in head if b < 32 and b not in b"\t\n\r\f\b")
+    return control > len(head) // 10
+
+
+def human_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class FilePreview:
+    def __init__(self, path, kind, size=0, text="", image=None, truncated=False):
+        self.path = path
+        self.kind = kind      # "text" | "image" | "binary" | "directory" | "missing"
+        self.size = size
+        self.text = text
+        self.image = image    # QImage thumbnail, kind == "image"
+        self.truncated = truncated
+
+    def summary(self) -> str:
+        name = os.path.basename(self.path.rstrip(os.sep)) or self.path
+        if self.kind == "missing":
+            return f"{name}\n(file not found)"
+        if self.kind == "directory":
+            return f"{name}/\n\n{self.text}"
+        header = f"{name} ({human_size(self.size)})"
+        if self.kind == "text":
+            return f"{header}\n\n{self.text}" + ("\n…" if self.truncated else "")
+        return f"{header}\n{self.text}"
+
+
+def read_preview(path: str) -> FilePreview:
+    """Build a preview from at most MAX_HEAD_BYTES of the file (thread-safe)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return FilePreview(path, "missing")
+
+    if os.path.isdir(path):
+        names = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                names.append(entry.name + ("/" if entry.is_dir() else ""))
+                if len(names) >= MAX_DIR_ENTRIES:
+                    names.append("…")
+                    break
+        return FilePreview(path, "directory", text="\n".join(sorted(names)))
+
+    size = st.st_size
+    head = b""
+    if size:
+        with open(path, "rb") as f:
+            try:
+                # Maps only the capped head, the rest of the file is never touched
+                with mmap.mmap(f.fileno(), min(size, MAX_HEAD_BYTES), access=mmap.ACCESS_READ) as view:
+                    head = view[:]
+            except (OSError, ValueError):
+                # Pipes, special files, filesystems without mmap
+                head = f.read(MAX_HEAD_BYTES)
+
+    if _looks_like_image(head):
+        if size <= MAX_IMAGE_BYTES:
+            image = _thumbnail(path)
+            if image is not None:
+                return FilePreview(path, "image", size, image=image)
+        return FilePreview(path, "binary", size, text="Image")
+
+    if _looks_binary(head):
+        return FilePreview(path, "binary", size, text="Binary file")
+
+    text = codecs.getincrementaldecoder("utf-8")("replace").decode(head, final=size <= MAX_HEAD_BYTES)
+    return FilePreview(path, "text", size, text=text, truncated=size > MAX_HEAD_BYTES)
+
+
+def _thumbnail(path: str):
+    reader = QImageReader(path)
+    source = reader.size()
+    if source.isValid() and (source.width() > THUMBNAIL_SIZE.width() or source.height() > THUMBNAIL_SIZE.height()):
+        # Lets JPEG decode straight at the reduced size
+        reader.setScaledSize(source.scaled(THUMBNAIL_SIZE, Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    return image
+
+
+class FilePreviewer(QObject):
+    """
+    Builds file previews on a worker thread, cached by (path, mtime, size).
+
+    `request(path)` returns at once; `ready` is emitted on the GUI thread
+    with the FilePreview. Only the most recent request is delivered.
+    """
+    ready = Signal(object)  # FilePreview
+    _finished = Signal(int, object)
+
+    def __init__(self, max_cached=64, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._cache = OrderedDict()
+        self._max_cached = max_cached
+        self._lock = threading.Lock()
+        self._latest = 0
+        self._finished.connect(self._on_finished)
+
+    def request(self, path: str):
+        self._latest += 1
+        ticket = self._latest
+        self._pool.start(lambda: self._run(ticket, path))
+
+    def _run(self, ticket, path):
+        # Worker thread
+        if ticket != self._latest:
+            return  # superseded before it started
+        try:
+            preview = self._cached(path)
+        except Exception:
+            traceback.print_exc()
+            preview = FilePreview(path, "missing")
+        self._finished.emit(ticket, preview)
+
+    def _cached(self, path):
+        try:
+            st = os.stat(path)
+            key = (path, st.st_mtime_ns, st.st_size)
+        except OSError:
+            return FilePreview(path, "missing")
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        preview = read_preview(path)
+        with self._lock:
+            self._cache[key] = preview
+            while len(self._cache) > self._max_cached:
+                self._cache.popitem(last=False)
+        return preview
+
+    def _on_finished(self, ticket, preview):
+        # GUI thread
+        if ticket == self._latest:
+            self.ready.emit(preview)
@@ -0,0 +1,106 @@
+import re
+import html as html_lib
+
+# Plain-text rendition kept per HTML item (search, list, preview)
+PLAIN_TEXT_CHARS = 128 * 1024
+
+# One token per match: comment, doctype / processing instruction, tag, or text run
+_TOKEN_RE = re.compile(r"""
+    (?P<comment><!--.*?(?:-->|\Z))
+  | (?P<decl><[!?][^>]*>?)
+  | <(?P<close>/)?(?P<tag>[a-zA-Z][a-zA-Z0-9]*)[^>]*>?
+  | (?P<text>[^<]+|<)
+""", re.DOTALL | re.VERBOSE)
+
+# Document structure or semantic markup. Editors (VS Code, JetBrains) wrap
+# plain text in styled <div>/<span> only, that alone is not "real" HTML.
+_REAL_TAGS = frozenset((
+    "html", "body", "head", "p", "table", "ul", "ol", "li", "br",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "img", "a",
+))
+_BLOCK_TAGS = frozenset((
+    "p", "div", "br", "li", "tr", "table", "ul", "ol", "pre", "blockquote",
+    "h1", "h2", "h3", "h4", "h5", "h6", "hr", "dt", "dd", "section",
+    "article", "header", "footer", "nav", "aside", "title",
+))
+# Elements whose content is never text
+_SKIP_TAGS = frozenset(("script", "style", "template", "noscript", "head"))
+
+# Rest of the markup, once the text budget is spent: only the verdict matters
+_REAL_TAG_RE = re.compile(r"<(?:%s)[\s/>]" % "|".join(sorted(_REAL_TAGS, key=len, reverse=True)), re.IGNORECASE)
+
+_SPACES_RE = re.compile(r"\s+")
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")
+
+
+class HtmlScan:
+    def __init__(self, is_real: bool, text: str, truncated: bool):
+        self.is_real = is_real
+        self.text = text
+        self.truncated = truncated
+
+
+def scan_html(markup: str, max_chars: int = PLAIN_TEXT_CHARS) -> HtmlScan:
+    """
+    Tokenize `markup` once: decide whether it is real HTML and extract
+    up to `max_chars` of sanitized plain text. Past the text budget the
+    rest is only searched for a semantic tag, without tokenizing.
+    """
+    is_real = False
+    parts, size = [], 0
+    truncated = False
+    skip = None     # tag whose content is being skipped
+    pre = 0         # <pre> depth, whitespace kept as is
+    at_line_start = True
+
+    for match in _TOKEN_RE.finditer(markup):
+        tag = match.group("tag")
+        if tag is not None:
+            tag = tag.lower()
+            closing = match.group("close") is not None
+            if tag in _REAL_TAGS:
+                is_real = True
+            if skip is not None:
+                if closing and tag == skip:
+                    skip = None
+            elif tag in _SKIP_TAGS and not closing:
+                skip = tag
+            else:
+                if tag == "pre":
+                    pre = max(0, pre - 1) if closing else pre + 1
+                if tag in _BLOCK_TAGS and not at_line_start and size < max_chars:
+                    parts.append("\n")
+                    size += 1
+                    at_line_start = True
+                elif tag in ("td", "th") and closing and size < max_chars:
+                    parts.append(" ")
+                    size += 1
+        else:
+            run = match.group("text")
+            if run is None or skip is not None:
+                continue  # comment, declaration or skipped content
+            if size >= max_chars:
+                truncated = True
+                if not is_real:
+                    is_real = _REAL_TAG_RE.search(markup, match.start()) is not None
+                break
+            run = html_lib.unescape(run)
+            if not pre:
+                run = _SPACES_RE.sub(" ", run)
+                if at_line_start:
+                    run = run.lstrip(" ")
+            if run:
+                run = _CONTROL_RE.sub("", run)[:max_chars - size]
+                parts.append(run)
+                size += len(run)
+                at_line_start = run.endswith("\n")
+
+        if is_real and size >= max_chars:
+            truncated = truncated or (max_chars > 0 and match.end() < len(markup))
+            break
+
+    return HtmlScan(is_real, "".join(parts).strip(), truncated)
+
+
+def html_to_text(markup: str, max_chars: int = PLAIN_TEXT_CHARS) -> str:
+    return scan_html(markup, max_chars).text
@@ -0,0 +1,150 @@
+import os
+import heapq
+import time
+import itertools
+import traceback
+from types import GeneratorType
+from PySide6.QtCore import QObject, QTimer
+
+
+class IdleTask:
+    """
+    A unit of deferred work.
+
+    `fn` is either a plain callable (one step) or a generator function;
+    a generator is advanced one `next()` at a time so long jobs can be
+    spread over several idle slices.
+    """
+
+    def __init__(self, fn, priority=0, name=None):
+        self.fn = fn
+        self.priority = priority
+        self.name = name or getattr(fn, "__name__", "task")
+        self.cancelled = False
+        self._steps = None
+
+    def step(self) -> bool:
+        """Run one step, return True when the task is finished."""
+        if self._steps is None:
+            result = self.fn()
+            if not isinstance(result, GeneratorType):
+                return True
+            self._steps = result
+        try:
+            next(self._steps)
+        except StopIteration:
+            return True
+        return False
+
+    def __repr__(self):
+        return f"IdleTask(name={self.name!r}, priority={self.priority})"
+
+
+class IdleScheduler(QObject):
+    """
+    Runs deferred work only while the app is idle.
+
+    Work starts `idle_delay_ms` after the last `notify_activity()` and runs
+    in slices of at most `slice_ms` from a zero-interval timer, so the event
+    loop handles input between slices. It also waits while the system load
+    average per CPU is above `max_load`. Lower `priority` runs first.
+    """
+
+    def __init__(self, idle_delay_ms=750, slice_ms=8, max_load=0.8, parent=None):
+        super().__init__(parent)
+        self.idle_delay_ms = idle_delay_ms
+        self.slice_ms = slice_ms
+        self.max_load = max_load
+
+        self._queue = []
+        self._counter = itertools.count()
+        self._depth = 0
+        self._current = None
+
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.timeout.connect(self._on_idle)
+
+        self._run_timer = QTimer(self)
+        self._run_timer.setInterval(0)
+        self._run_timer.timeout.connect(self._run_slice)
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def schedule(self, fn, priority=0, name=None) -> IdleTask:
+        task = IdleTask(fn, priority, name)
+        heapq.heappush(self._queue, (priority, next(self._counter), task))
+        self._depth += 1
+        if not self._run_timer.isActive() and not self._idle_timer.isActive():
+            self._idle_timer.start(self.idle_delay_ms)
+        return task
+
+    def cancel(self, task: IdleTask):
+        if task.cancelled:
+            return
+        task.cancelled = True
+        if task is self._current:
+            self._current = None
+        self._depth -= 1
+
+    def notify_activity(self):
+        """The user (or capture) is busy: pause until idle again."""
+        self._run_timer.stop()
+        if self._depth:
+            self._idle_timer.start(self.idle_delay_ms)
+
+    def is_running(self) -> bool:
+        return self._run_timer.isActive()
+
+    def clear(self):
+        for _, _, task in self._queue:
+            task.cancelled = True
+        self._queue.clear()
+        self._current = None
+        self._run_timer.stop()
+        self._idle_timer.stop()
+        self._depth = 0
+
+    # ------------------------------
+    # Internals
+    # ------------------------------
+    def _cpu_busy(self) -> bool:
+        if not hasattr(os, "getloadavg"):  # Windows
+            return False
+        return os.getloadavg()[0] / (os.cpu_count() or 1) > self.max_load
+
+    def _on_idle(self):
+        if self._cpu_busy():
+            self._idle_timer.start(self.idle_delay_ms)
+            return
+        self._run_timer.start()
+
+    def _next_task(self):
+        if self._current is not None:
+            return self._current
+        while self._queue:
+            _, _, task = heapq.heappop(self._queue)
+            if not task.cancelled:
+                self._current = task
+                return task
+        return None
+
+    def _run_slice(self):
+        deadline = time.perf_counter() + self.slice_ms / 1000
+        while time.perf_counter() < deadline:
+            task = self._next_task()
+            if task is None:
+                self._run_timer.stop()
+                return
+            try:
+                done = task.step()
+            except Exception:
+                traceback.print_exc()
+                done = True
+            if done and task is self._current:
+                self._current = None
+                self._depth -= 1
+        if self._cpu_busy():
+            self._run_timer.stop()
+            self._idle_timer.start(self.idle_delay_ms)
@@ -0,0 +1,205 @@
+import time
+import threading
+import traceback
+from collections import OrderedDict
+from PySide6.QtGui import QImage
+from PySide6.QtCore import QObject, QThreadPool, Signal, QBuffer, QIODevice, QByteArray, Qt
+
+# Qt maps PNG "quality" to the zlib level: 80 is level 1, the fast end
+PNG_FAST_QUALITY = 80
+
+# Exact palette or nothing: no dithering, no approximated colours
+_EXACT_PALETTE = Qt.ThresholdDither | Qt.AvoidDither
+
+
+def _is_opaque(image: QImage) -> bool:
+    alpha = image.convertToFormat(QImage.Format_Alpha8)
+    width, stride = alpha.width(), alpha.bytesPerLine()
+    data = alpha.constBits().tobytes()
+    if width == stride:
+        return data.count(b"\xff") == len(data)
+    # Scanline padding is undefined, count each row on its own
+    return all(data[y * stride:y * stride + width].count(b"\xff") == width for y in range(alpha.height()))
+
+
+def normalize_image(image: QImage) -> QImage:
+    """
+    Most compact lossless format for a 24/32-bit image (thread-safe).
+
+    Grayscale8 for grey pixels, else Indexed8 when the colours fit an
+    exact palette, else RGB888 when fully opaque, else ARGB32. The result
+    only depends on the pixels, not on the format they arrived in, so it
+    is also the canonical form fingerprints are computed on.
+    """
+    if image.isNull() or image.depth() not in (24, 32):
+        return image  # already compact (mono, indexed) or deeper than 8 bits per channel
+    if image.hasAlphaChannel() and not _is_opaque(image):
+        base = image.convertToFormat(QImage.Format_ARGB32)
+    else:
+        base = image.convertToFormat(QImage.Format_RGB888)
+
+    indexed = base.convertToFormat(QImage.Format_Indexed8, _EXACT_PALETTE)
+    # Past 256 colours Qt falls back to an approximate palette
+    if indexed.convertToFormat(base.format()) != base:
+        return base
+    table = indexed.colorTable()
+    if base.format() == QImage.Format_RGB888 and all(
+            (c >> 16) & 0xff == (c >> 8) & 0xff == c & 0xff for c in table):
+        return indexed.convertToFormat(QImage.Format_Grayscale8)
+    return indexed
+
+
+def encode_png(image: QImage, quality=PNG_FAST_QUALITY) -> QByteArray:
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG", quality)
+    return buffer.data()
+
+
+class CompressedImage:
+    """
+    Image kept in memory as PNG bytes, with its size.
+
+    Stands in for the QImage content of a clipboard item like SpilledImage
+    does: `width()` and `height()` answer like QImage's, `read()` decodes.
+    """
+    __slots__ = ("data", "_width", "_height")
+
+    def __init__(self, data: QByteArray, width: int, height: int):
+        self.data = data
+        self._width = width
+        self._height = height
+
+    @classmethod
+    def encode(cls, image: QImage) -> "CompressedImage":
+        return cls(encode_png(image), image.width(), image.height())
+
+    def width(self) -> int:
+        return self._width
+
+    def height(self) -> int:
+        return self._height
+
+    def nbytes(self) -> int:
+        return self.data.size()
+
+    def read(self) -> QImage:
+        return QImage.fromData(self.data, "PNG")
+
+
+class DecodedImageCache:
+    """
+    The few full-size images in use (preview, paste, OCR), decoded once.
+
+    LRU bounded by `max_bytes`, keyed by fingerprint. Records hit/miss
+    counts and load latency for `stats()`. Thread-safe.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._load_ms_total = 0.0
+        self._load_ms_max = 0.0
+
+    def get(self, key: str, load) -> QImage:
+        """Cached image, or `load()` it (outside the lock) and keep it."""
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self._hits += 1
+                return image
+            self._misses += 1
+        start = time.perf_counter()
+        image = load()
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._load_ms_total += elapsed
+            self._load_ms_max = max(self._load_ms_max, elapsed)
+            if image.sizeInBytes() <= self.max_bytes:
+                if key in self._images:
+                    self._bytes -= self._images.pop(key).sizeInBytes()
+                self._images[key] = image
+                self._bytes += image.sizeInBytes()
+                while self._bytes > self.max_bytes:
+                    _, old = self._images.popitem(last=False)
+                    self._bytes -= old.sizeInBytes()
+        return image
+
+    def forget(self, key: str):
+        with self._lock:
+            image = self._images.pop(key, None)
+            if image is not None:
+                self._bytes -= image.sizeInBytes()
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            loads = self._misses
+            return {
+                "entries": len(self._images),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "load_ms_avg": self._load_ms_total / loads if loads else 0.0,
+                "load_ms_max": self._load_ms_max,
+            }
+
+
+# Shared by every item, so memory for decoded images has one bound
+decoded_images = DecodedImageCache()
+
+
+class ImageCompressor(QObject):
+    """
+    PNG-encodes images on a worker thread.
+
+    `request(item)` returns at once; `compressed` is emitted on the GUI
+    thread with the item and its CompressedImage. The item's QImage is only
+    read by the worker, swapping it in is left to the receiver.
+    `request_png(item)` gets the PNG bytes of an item's image however it is
+    kept (an upload); `encoded` brings them, or None if that failed.
+    """
+    compressed = Signal(object, object)  # ClipboardItemStruct, CompressedImage
+    encoded = Signal(object, object)  # ClipboardItemStruct, QByteArray or None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def request(self, item, image: QImage):
+        self._pool.start(lambda: self._run(item, image))
+
+    def _run(self, item, image):
+        # Worker thread
+        try:
+            compressed = CompressedImage.encode(image)
+        except Exception:
+            traceback.print_exc()
+            return
+        self.compressed.emit(item, compressed)
+
+    def request_png(self, item):
+        self._pool.start(lambda: self._run_png(item))
+
+    def _run_png(self, item):
+        # Worker thread
+        try:
+            png = item.png_bytes()
+        except Exception:
+            traceback.print_exc()
+            png = None
+        self.encoded.emit(item, png)
+
+    def wait_for_done(self):
+        self._pool.waitForDone()
@@ -0,0 +1,151 @@
+from PySide6.QtGui import QImage
+from PySide6.QtCore import Qt
+
+# dHash grid: HASH_SIZE x HASH_SIZE bits (256), fine enough to tell screenshots apart
+HASH_SIZE = 16
+
+
+def dhash(image: QImage, size=HASH_SIZE) -> int:
+    """
+    Difference hash of an image (thread-safe).
+
+    The image is scaled down to (size + 1) x size grey pixels by Qt, and
+    each bit tells whether a pixel is brighter than its right neighbour.
+    Small local changes (a cursor, a clock) leave it alone or flip a few
+    bits; compare hashes with `hamming`.
+    """
+    grey = image.scaled(size + 1, size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation) \
+        .convertToFormat(QImage.Format_Grayscale8)
+    stride = grey.bytesPerLine()
+    data = grey.constBits().tobytes()
+    bits = 0
+    for y in range(size):
+        row = data[y * stride:y * stride + size + 1]
+        for left, right in zip(row, row[1:]):
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def mean_difference(a: QImage, b: QImage) -> float:
+    """
+    Mean per-channel difference (0-255) of two small images, `b` scaled to `a`.
+
+    dHash only sees gradients: flat images of different colours hash alike.
+    Comparing the list thumbnails catches those.
+    """
+    a = a.convertToFormat(QImage.Format_RGB888)
+    b = b.scaled(a.size(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation).convertToFormat(QImage.Format_RGB888)
+    width, total = a.width() * 3, 0
+    data_a, data_b = a.constBits().tobytes(), b.constBits().tobytes()
+    for y in range(a.height()):
+        row_a = data_a[y * a.bytesPerLine():y * a.bytesPerLine() + width]
+        row_b = data_b[y * b.bytesPerLine():y * b.bytesPerLine() + width]
+        total += sum(abs(p - q) for p, q in zip(row_a, row_b))
+    return total / max(width * a.height(), 1)
+
+
+class _Node:
+    __slots__ = ("hash", "keys", "children")
+
+    def __init__(self, value: int):
+        self.hash = value
+        self.keys = set()
+        self.children = {}  # distance -> _Node
+
+
+class BKTree:
+    """
+    Perceptual hashes indexed for near-neighbour queries under Hamming distance.
+
+    `search(hash, radius)` only visits the subtrees whose distance to the
+    query allows a match, far fewer than all entries for small radii.
+    Keys sharing a hash share a node. Removal leaves empty nodes in place
+    as routing points; the tree is rebuilt once they outnumber live ones.
+    Not thread-safe, owned by the GUI thread.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._hashes = {}  # key -> hash
+        self._nodes = 0
+        self._live_nodes = 0
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __contains__(self, key):
+        return key in self._hashes
+
+    def add(self, key, value: int):
+        if key in self._hashes:
+            self.remove(key)
+        self._hashes[key] = value
+        self._insert(key, value)
+
+    def _insert(self, key, value: int):
+        if self._root is None:
+            self._root = _Node(value)
+            self._nodes = 1
+            node = self._root
+        else:
+            node = self._root
+            while node.hash != value:
+                distance = hamming(node.hash, value)
+                child = node.children.get(distance)
+                if child is None:
+                    child = node.children[distance] = _Node(value)
+                    self._nodes += 1
+                node = child
+        if not node.keys:
+            self._live_nodes += 1
+        node.keys.add(key)
+
+    def remove(self, key):
+        value = self._hashes.pop(key, None)
+        if value is None:
+            return
+        node = self._find(value)
+        node.keys.discard(key)
+        if not node.keys:
+            self._live_nodes -= 1
+            if self._nodes - self._live_nodes > max(self._live_nodes, 64):
+                self._rebuild()
+
+    def _find(self, value: int) -> _Node:
+        node = self._root
+        while node.hash != value:
+            node = node.children[hamming(node.hash, value)]
+        return node
+
+    def _rebuild(self):
+        entries = list(self._hashes.items())
+        self._root = None
+        self._nodes = self._live_nodes = 0
+        for key, value in entries:
+            self._insert(key, value)
+
+    def search(self, value: int, radius: int):
+        """(distance, key) of entries within `radius` of `value`, closest first."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(node.hash, value)
+            if distance <= radius:
+                found.extend((distance, key) for key in node.keys)
+            # Triangle inequality: matches below a child lie within radius of its edge
+            for edge in range(max(distance - radius, 0), distance + radius + 1):
+                child = node.children.get(edge)
+                if child is not None:
+                    stack.append(child)
+        found.sort(key=lambda entry: entry[0])
+        return found
+
+    def clear(self):
+        self._root = None
+        self._hashes.clear()
+        self._nodes = self._live_nodes = 0
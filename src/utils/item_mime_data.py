@@ -0,0 +1,67 @@
+from PySide6.QtCore import QMimeData, QBuffer, QByteArray, QIODevice
+from src.components.cliboard_item_struct import ClipboardItemStruct, SELF_MIME_FORMAT
+
+_PRIMARY_FORMATS = {
+    "image": ("application/x-qt-image", "image/png"),
+    "url": ("text/uri-list",),
+    "html": ("text/html",),
+    "text": ("text/plain",),
+}
+
+
+class ItemMimeData(QMimeData):
+    """
+    Delayed-rendering QMimeData for a history item.
+
+    Only announces the item's formats; payloads are produced in
+    `retrieveData` when the pasting application actually asks for them.
+    """
+
+    def __init__(self, item: ClipboardItemStruct):
+        super().__init__()
+        self._item = item
+        formats = list(_PRIMARY_FORMATS.get(item.content_type, ("text/plain",)))
+        if item.mime_bundle is not None:
+            formats += [f for f in item.mime_bundle.extra_formats() if f not in formats]
+        formats.append(SELF_MIME_FORMAT)
+        self._formats = formats
+
+    def formats(self):
+        return list(self._formats)
+
+    def hasFormat(self, mimetype):
+        return mimetype in self._formats
+
+    def retrieveData(self, mimetype, preferred_type):
+        item = self._item
+        if mimetype == SELF_MIME_FORMAT:
+            return QByteArray(item.fingerprint().encode())
+
+        if item.mime_bundle is not None:
+            payload = item.mime_bundle.payload(mimetype)
+            if payload is not None:
+                return payload
+
+        content_type = item.content_type
+        if content_type == "image":
+            if mimetype == "application/x-qt-image":
+                return item.content
+            if mimetype == "image/png" and item.encoded_png() is not None:
+                return item.encoded_png()
+            if mimetype.startswith("image/"):
+                return self._encode_image(mimetype.split("/", 1)[1])
+        elif content_type == "url":
+            if mimetype == "text/uri-list":
+                return item.content
+        elif content_type == "html":
+            if mimetype == "text/html":
+                return item.content
+        elif mimetype.startswith("text/plain"):
+            return item.content
+        return None
+
+    def _encode_image(self, image_format: str):
+        buffer = QBuffer()
+        buffer.open(QIODevice.WriteOnly)
+        self._item.content.save(buffer, image_format.upper())
+        return buffer.data()
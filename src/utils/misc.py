@@ -1,5 +1,6 @@
 import os
 import sys
+from PySide6.QtCore import QStandardPaths
 
 
 def str_to_bool(value):
@@ -37,3 +38,10 @@ BUTTON_ICONS = {
     "tray_icon": resource_path("src/assets/icon.png"),
 }
 
+
+def cache_dir(*parts):
+    """ Per-user cache directory for ClipOmnia (created on demand) """
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+    path = os.path.join(base or os.path.expanduser("~"), "ClipOmnia", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -49,7 +49,8 @@ class OCRClient(QObject):
 
         return file_data, filename, mime
 
-    def send_ocr_request(self, image_source: Union[str, bytes], api_url: str = "http://localhost:8000/ocr", callback=None):
+    def send_ocr_request(self, image_source: Union[str, bytes], api_url: str = "http://localhost:8000/ocr", callback=None,
+                         error_callback=None):
         """
         Send OCR request.
         
@@ -57,6 +58,7 @@ class OCRClient(QObject):
             image_source: Either file path (str) or image bytes (bytes/QByteArray)
             api_url: API endpoint URL
             callback: Optional callback function(result_dict) called on success
+            error_callback: Optional callback function(error_message) called on failure
             filename: Filename to use when sending bytes (ignored if image_source is a path)
         """
         multipart = QHttpMultiPart(QHttpMultiPart.FormDataType)
@@ -98,7 +100,8 @@ class OCRClient(QObject):
         multipart.setParent(reply)
         self._active_requests[reply] = {
             'multipart': multipart,
-            'callback': callback
+            'callback': callback,
+            'error_callback': error_callback,
         }
 
 
@@ -106,6 +109,7 @@ class OCRClient(QObject):
     def handle_reply(self, reply):
         request_data = self._active_requests.get(reply, {})
         callback = request_data.get('callback')
+        error_callback = request_data.get('error_callback')
         
         # Clean up
         if reply in self._active_requests:
@@ -121,6 +125,8 @@ class OCRClient(QObject):
             if data:
                 print("Response body:", data.decode('utf-8', errors='replace'))
             self.ocr_error.emit(error_msg)
+            if error_callback:
+                error_callback(error_msg)
             reply.deleteLater()
             return
 
@@ -141,6 +147,8 @@ class OCRClient(QObject):
             print(error_msg)
             print("Raw response:", data.decode('utf-8', errors='replace'))
             self.ocr_error.emit(error_msg)
+            if error_callback:
+                error_callback(error_msg)
         
         reply.deleteLater()
 
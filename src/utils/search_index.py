@@ -0,0 +1,44 @@
+from typing import Set
+
+
+class SearchIndex:
+    """
+    Normalized (flattened, lower-cased) search text per item fingerprint.
+
+    Text is normalized once when an item is indexed, so a query only runs
+    a substring test per entry instead of re-lowering every item.
+    """
+
+    def __init__(self):
+        self._texts = {}
+
+    def __len__(self):
+        return len(self._texts)
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self._texts
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return text.replace("\n", " ").lower()
+
+    def add(self, fingerprint: str, text: str, normalized: bool = False):
+        """Index `text`; pass normalized=True if it went through `normalize` already."""
+        text = text or ""
+        self._texts[fingerprint] = text if normalized else self.normalize(text)
+
+    def append(self, fingerprint: str, text: str):
+        """Add more searchable text (e.g. OCR output) to an indexed item."""
+        if text:
+            self._texts[fingerprint] = f"{self._texts.get(fingerprint, '')} {self.normalize(text)}"
+
+    def remove(self, fingerprint: str):
+        self._texts.pop(fingerprint, None)
+
+    def clear(self):
+        self._texts.clear()
+
+    def search(self, term: str) -> Set[str]:
+        """Fingerprints whose text contains `term` (case-insensitive)."""
+        term = term.lower()
+        return {fp for fp, text in self._texts.items() if term in text}
@@ -0,0 +1,157 @@
+import re
+import math
+from collections import Counter
+from PySide6.QtCore import QMimeData
+
+# Longest text scanned whole; past it only the head and tail are scanned
+MAX_SCAN_CHARS = 1024 * 1024
+# High-entropy check: a copy that is one token of this length (a password,
+# an API key). Tokens inside longer text are too often code or data.
+MIN_TOKEN_CHARS = 16
+MAX_TOKEN_CHARS = 512
+
+MASK = "••••••••"
+
+# Known key formats, tried in this order at every position
+_KNOWN_PATTERNS = (
+    ("private_key", r"-----BEGIN (?:[A-Z]+ )*PRIVATE KEY(?: BLOCK)?-----"),
+    ("aws_key", r"\b(?:AKIA|ASIA)[0-9A-Z]{16}\b"),
+    ("github_token", r"\b(?:gh[pousr]_[A-Za-z0-9]{36,255}|github_pat_[A-Za-z0-9_]{22,255})\b"),
+    ("gitlab_token", r"\bglpat-[A-Za-z0-9_-]{20,}\b"),
+    ("slack_token", r"\bxox[abposr]-[A-Za-z0-9-]{10,}\b"),
+    ("stripe_key", r"\b[rs]k_live_[A-Za-z0-9]{16,}\b"),
+    ("google_api_key", r"\bAIza[0-9A-Za-z_-]{35}\b"),
+    ("api_key", r"\bsk-[A-Za-z0-9_-]{20,}"),
+    ("jwt", r"\beyJ[A-Za-z0-9_-]{8,}\.eyJ[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]{8,}"),
+    # A quoted literal only, and its value must look random too (see
+    # `scan`): `password=None` or `token = get_token(request)` is code
+    ("assignment", r"(?i:\b(?:password|passwd|pwd|secret|token|api[_-]?key|access[_-]?key)\b)"
+                   r"[\"']?\s*[:=]\s*[\"'](?P<assignment_value>[^\s\"']{8,%d})[\"']" % MAX_TOKEN_CHARS),
+)
+_TOKEN_RE = re.compile(r"\s*([!-~]{%d,%d})\s*" % (MIN_TOKEN_CHARS, MAX_TOKEN_CHARS))
+_VOWELS = frozenset("aeiouAEIOU")
+_IDENTIFIER_RE = re.compile(r"\w+", re.ASCII)
+_LOCATION_RE = re.compile(r"[a-z][a-z0-9+.-]*://|www\.|[/~]|[a-z]:[\\/]", re.IGNORECASE)
+
+# Clipboard formats password managers set to ask clipboard tools to keep out:
+# KDE/KeePassXC, Windows clipboard history, nspasteboard.org (macOS)
+_CONCEALED_FORMATS = (
+    "x-kde-passwordManagerHint",
+    "ExcludeClipboardContentFromMonitorProcessing",
+    "Clipboard Viewer Ignore",
+    "org.nspasteboard.ConcealedType",
+    "org.nspasteboard.TransientType",
+)
+# Windows: a DWORD, 0 keeps the copy out of clipboard history, 1 allows it
+_HISTORY_FORMAT = "CanIncludeInClipboardHistory"
+
+
+def shannon_entropy(token: str) -> float:
+    """Bits per character."""
+    size = len(token)
+    return -sum(n / size * math.log2(n / size) for n in Counter(token).values())
+
+
+class SecretMatch:
+    def __init__(self, kind: str, start: int, end: int):
+        self.kind = kind
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"SecretMatch({self.kind!r}, {self.start}, {self.end})"
+
+
+class SecretFilter:
+    """
+    Finds credentials in captured text.
+
+    Known key formats and user patterns are one alternation, so text is
+    scanned in a single regex pass. Text longer than MAX_SCAN_CHARS is
+    scanned in its head and tail only, which keeps capture time bounded.
+    A copy that is a single random-looking token is a secret too.
+    """
+
+    def __init__(self, user_patterns=(), min_entropy: float = 4.0):
+        self.min_entropy = min_entropy
+        groups = [f"(?P<{name}>{pattern})" for name, pattern in _KNOWN_PATTERNS]
+        for i, pattern in enumerate(user_patterns):
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                print(f"Ignoring secret pattern {pattern!r}: {e}")
+                continue
+            groups.append(f"(?P<user_{i}>{pattern})")
+        self._regex = re.compile("|".join(groups))
+
+    @staticmethod
+    def is_concealed(mime: QMimeData) -> bool:
+        """The source marked this copy as sensitive (cheap: format names, one tiny payload)."""
+        for fmt in mime.formats():
+            if any(hint in fmt for hint in _CONCEALED_FORMATS):
+                return True
+            if _HISTORY_FORMAT in fmt:
+                value = mime.data(fmt).data()
+                if len(value) >= 4 and int.from_bytes(value[:4], "little") == 0:
+                    return True
+        return False
+
+    def _windows(self, text: str):
+        if len(text) <= MAX_SCAN_CHARS:
+            return ((0, len(text)),)
+        half = MAX_SCAN_CHARS // 2
+        return (0, half), (len(text) - half, len(text))
+
+    def _is_random(self, token: str) -> bool:
+        # Hex ids and plain words are single-class, URLs and paths are
+        # locations, identifiers are pronounceable (random letters are ~20%
+        # vowels); short tokens can't reach the full entropy threshold
+        classes = (any(c.islower() for c in token) + any(c.isupper() for c in token)
+                   + any(c.isdigit() for c in token) + any(not c.isalnum() for c in token))
+        if classes < 3 or _LOCATION_RE.match(token):
+            return False
+        letters = sum(c.isalpha() for c in token)
+        max_vowels = 0.3 if _IDENTIFIER_RE.fullmatch(token) else 0.35
+        if letters and sum(c in _VOWELS for c in token) / letters > max_vowels:
+            return False
+        threshold = min(self.min_entropy, 0.85 * math.log2(len(token)))
+        return shannon_entropy(token) >= threshold
+
+    def scan(self, text: str, limit: int = None):
+        """Secrets in `text`, in order; stop after `limit` matches."""
+        matches = []
+        if len(text) <= MAX_TOKEN_CHARS + 64:
+            token = _TOKEN_RE.fullmatch(text)
+            if token and self._is_random(token.group(1)):
+                return [SecretMatch("high_entropy", token.start(1), token.end(1))]
+        for start, end in self._windows(text):
+            for match in self._regex.finditer(text, start, end):
+                kind = match.lastgroup
+                if kind == "assignment":
+                    value = match.group("assignment_value")
+                    if not self._is_random(value):
+                        continue
+                    # Mask the value, keep the name for context
+                    matches.append(SecretMatch(kind, match.start("assignment_value"), match.end("assignment_value")))
+                else:
+                    matches.append(SecretMatch(kind, match.start(), match.end()))
+                if limit is not None and len(matches) >= limit:
+                    return matches
+        return matches
+
+    def contains_secret(self, text: str) -> bool:
+        return bool(self.scan(text, limit=1))
+
+    def mask(self, text: str, matches=None) -> str:
+        """`text` with every secret replaced by MASK."""
+        if matches is None:
+            matches = self.scan(text)
+        parts, last = [], 0
+        for match in matches:
+            if match.start < last:
+                continue
+            parts.append(text[last:match.start])
+            parts.append(MASK)
+            last = match.end
+        parts.append(text[last:])
+        return "".join(parts)
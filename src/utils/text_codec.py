@@ -0,0 +1,153 @@
+import zlib
+import weakref
+import threading
+from collections import deque
+
+# zlib level for in-memory text: fast, most of the gain on text anyway
+TEXT_ZLIB_LEVEL = 1
+# Characters compared per step when measuring a shared prefix/suffix
+_MATCH_STEP = 4096
+# A delta is only kept when the base covers at least this share of the text
+MIN_DELTA_SHARE = 0.5
+
+
+def _common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = j = 0
+    while i < n:
+        j = min(i + _MATCH_STEP, n)
+        if a[i:j] != b[i:j]:
+            break
+        i = j
+    else:
+        return n
+    # Binary search inside the first differing step
+    lo, hi = i, j
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[i:mid] == b[i:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    """Length of the shared suffix, at most `limit` characters."""
+    la, lb = len(a), len(b)
+    i = j = 0
+    while i < limit:
+        j = min(i + _MATCH_STEP, limit)
+        if a[la - j:la - i] != b[lb - j:lb - i]:
+            break
+        i = j
+    else:
+        return limit
+    lo, hi = i, j
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[la - mid:la - i] == b[lb - mid:lb - i]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class CompressedText:
+    """
+    Text kept in memory zlib-compressed, with a head snippet and the length.
+
+    Stands in for the `str` content of a clipboard item like SpilledText
+    does. With a `base`, only the part that differs from it is stored:
+    the text is base[:prefix] + middle + base[len(base) - suffix:]. Bases
+    are never deltas themselves, so a read decompresses at most twice.
+    Immutable, safe to share between threads.
+    """
+    __slots__ = ("data", "head", "length", "base", "prefix", "suffix", "__weakref__")
+
+    def __init__(self, data: bytes, head: str, length: int, base: "CompressedText" = None, prefix=0, suffix=0):
+        self.data = data
+        self.head = head
+        self.length = length
+        self.base = base
+        self.prefix = prefix
+        self.suffix = suffix
+
+    @classmethod
+    def encode(cls, text: str, head_chars: int, bases=()) -> "CompressedText":
+        """Compress `text`, as a delta against the most similar of `bases` if that pays off."""
+        best, best_prefix, best_suffix = None, 0, 0
+        for base in bases:
+            if min(len(text), base.length) < len(text) * MIN_DELTA_SHARE:
+                continue  # can't share enough, don't decompress it
+            base_text = base.read()
+            prefix = _common_prefix(text, base_text)
+            suffix = _common_suffix(text, base_text, min(len(text), len(base_text)) - prefix)
+            if prefix + suffix > best_prefix + best_suffix:
+                best, best_prefix, best_suffix = base, prefix, suffix
+        if best is not None and best_prefix + best_suffix >= len(text) * MIN_DELTA_SHARE:
+            middle = text[best_prefix:len(text) - best_suffix]
+            return cls(cls._pack(middle), text[:head_chars], len(text), best, best_prefix, best_suffix)
+        return cls(cls._pack(text), text[:head_chars], len(text))
+
+    @staticmethod
+    def _pack(text: str) -> bytes:
+        return zlib.compress(text.encode("utf-8", "surrogatepass"), TEXT_ZLIB_LEVEL)
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def is_delta(self) -> bool:
+        return self.base is not None
+
+    def nbytes(self) -> int:
+        """
+        Own bytes in memory. A delta's base is accounted by the item holding
+        it; deltas are re-encoded once that item lets go of it.
+        """
+        return len(self.data) + len(self.head)
+
+    def read(self, limit: int = None) -> str:
+        if limit is not None and limit <= len(self.head):
+            return self.head[:limit]
+        text = zlib.decompress(self.data).decode("utf-8", "surrogatepass")
+        if self.base is not None:
+            base = self.base.read()
+            text = base[:self.prefix] + text + base[len(base) - self.suffix:]
+        return text if limit is None else text[:limit]
+
+    def contains(self, term: str) -> bool:
+        """Matches like SearchIndex: case-insensitive, newlines read as spaces."""
+        return term.lower() in self.read().replace("\n", " ").lower()
+
+
+class RecentTexts:
+    """
+    The last few compressed texts, candidate bases for deltas. Weakly held:
+    a text its item dropped is no candidate any more. Thread-safe.
+    """
+
+    def __init__(self, size=8):
+        self._texts = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        with self._lock:
+            refs = list(self._texts)
+        texts = []
+        for ref in refs:
+            text = ref()
+            if text is not None:
+                texts.append(text)
+        return texts
+
+    def add(self, text: CompressedText):
+        if text.is_delta:
+            return
+        with self._lock:
+            self._texts.append(weakref.ref(text))
+
+    def clear(self):
+        with self._lock:
+            self._texts.clear()
@@ -0,0 +1,146 @@
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from PySide6.QtGui import QImage
+from PySide6.QtCore import QSize, Qt
+
+# Sizes capture renders for every image: list row icon, preview pane
+LIST_THUMBNAIL = QSize(32, 32)
+PREVIEW_THUMBNAIL = QSize(1024, 1024)
+
+
+class ThumbnailCache:
+    """
+    Scaled-down QImages keyed by content fingerprint and size.
+
+    Kept on disk as PNG (so re-copies in a session never rescale the same
+    image) until `forget` or `clear`, least recently used files deleted
+    past `max_disk_bytes`; the most recently used ones are also in memory up
+    to `max_memory_bytes`. QImage only, safe to use from worker threads;
+    pixmaps are made by the widgets that paint them.
+    """
+
+    def __init__(self, root: str, max_memory_bytes=32 * 1024 * 1024, max_disk_bytes=128 * 1024 * 1024):
+        self.root = root
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._files = OrderedDict()  # path -> bytes, least recently used first
+        self._paths = {}  # fingerprint -> its paths in _files
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, fingerprint: str, size: QSize) -> str:
+        return os.path.join(self.root, fingerprint[:2], f"{fingerprint}-{size.width()}x{size.height()}.png")
+
+    # ------------------------------
+    # Lookup
+    # ------------------------------
+    def get(self, fingerprint: str, size: QSize):
+        key = (fingerprint, size.width(), size.height())
+        path = self.path(fingerprint, size)
+        with self._lock:
+            if path in self._files:
+                self._files.move_to_end(path)  # recency for the disk budget
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+                return image
+
+        image = QImage(path) if os.path.exists(path) else QImage()
+        if image.isNull():
+            return None
+        self._remember(key, image)
+        return image
+
+    def get_or_create(self, fingerprint: str, size: QSize, source: QImage, persist=True) -> QImage:
+        """Cached thumbnail, or scale `source` once and cache the result."""
+        image = self.get(fingerprint, size)
+        if image is None:
+            image = scale_image(source, size)
+            self.put(fingerprint, size, image, persist)
+        return image
+
+    # ------------------------------
+    # Storing
+    # ------------------------------
+    def put(self, fingerprint: str, size: QSize, image: QImage, persist=True):
+        self._remember((fingerprint, size.width(), size.height()), image)
+        if not persist:
+            return
+        path = self.path(fingerprint, size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        if not image.save(tmp, "PNG"):
+            return
+        os.replace(tmp, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._disk_bytes += size - self._files.pop(path, 0)
+            self._files[path] = size
+            self._paths.setdefault(fingerprint, set()).add(path)
+            # Never the file just written
+            while self._disk_bytes > self.max_disk_bytes and len(self._files) > 1:
+                self._delete(next(iter(self._files)))
+
+    def _delete(self, path: str):
+        # Under the lock
+        self._disk_bytes -= self._files.pop(path)
+        fingerprint = os.path.basename(path).split("-", 1)[0]
+        paths = self._paths.get(fingerprint)
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del self._paths[fingerprint]
+        _remove(path)
+
+    def _remember(self, key, image: QImage):
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= self._memory.pop(key).sizeInBytes()
+            self._memory[key] = image
+            self._memory_bytes += image.sizeInBytes()
+            while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+                _, old = self._memory.popitem(last=False)
+                self._memory_bytes -= old.sizeInBytes()
+
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def disk_bytes(self) -> int:
+        return self._disk_bytes
+
+    def forget(self, fingerprint: str):
+        """Drop every size of one image, in memory and on disk (its entry left history)."""
+        with self._lock:
+            for key in [k for k in self._memory if k[0] == fingerprint]:
+                self._memory_bytes -= self._memory.pop(key).sizeInBytes()
+            for path in list(self._paths.get(fingerprint, ())):
+                self._delete(path)
+
+    def clear(self):
+        """Drop every thumbnail, in memory and on disk."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._files.clear()
+            self._paths.clear()
+            self._disk_bytes = 0
+            shutil.rmtree(self.root, ignore_errors=True)
+            os.makedirs(self.root, exist_ok=True)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def scale_image(image: QImage, size: QSize) -> QImage:
+    if image.width() <= size.width() and image.height() <= size.height():
+        return image
+    return image.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
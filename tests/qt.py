@@ -0,0 +1,13 @@
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QStandardPaths
+from PySide6.QtWidgets import QApplication
+
+# Settings and caches go to ~/.qttest, never to the user's own
+QStandardPaths.setTestModeEnabled(True)
+
+
+def qt_app() -> QApplication:
+    """The process-wide QApplication, created on first use."""
+    return QApplication.instance() or QApplication([])
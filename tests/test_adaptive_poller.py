@@ -0,0 +1,51 @@
+import unittest
+from PySide6.QtCore import QEventLoop, QTimer
+from tests.qt import qt_app
+from src.utils.adaptive_poller import AdaptivePoller
+
+
+class AdaptivePollerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def test_backs_off_to_the_cap_while_idle(self):
+        poller = AdaptivePoller(min_interval=100, max_interval=400, backoff=2)
+        poller.start()
+        intervals = []
+        for _ in range(4):
+            poller._on_timeout()
+            intervals.append(poller.interval)
+        poller.stop()
+        self.assertEqual(intervals, [200, 400, 400, 400])
+
+    def test_activity_resets_to_the_fastest_interval(self):
+        poller = AdaptivePoller(min_interval=100, max_interval=1000, backoff=2)
+        # The handler sees a change, as ClipboardManager._poll_all does
+        poller.timeout.connect(poller.notify_activity)
+        poller.start()
+        poller._on_timeout()
+        poller.stop()
+        self.assertEqual(poller.interval, 100)
+
+    def test_ticks_until_stopped(self):
+        poller = AdaptivePoller(min_interval=1, max_interval=5)
+        ticks = []
+        loop = QEventLoop()
+
+        def on_timeout():
+            ticks.append(poller.interval)
+            if len(ticks) == 3:
+                poller.stop()
+                loop.quit()
+
+        poller.timeout.connect(on_timeout)
+        poller.start()
+        QTimer.singleShot(2000, loop.quit)
+        loop.exec()
+        self.assertEqual(len(ticks), 3)
+        self.assertFalse(poller.isActive())
+
+
+if __name__ == "__main__":
+    unittest.main()
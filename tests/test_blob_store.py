@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from PySide6.QtGui import QColor, QImage
+from src.utils.blob_store import BlobStore, SpilledImage, SpilledText, encoded_key
+from src.utils.image_codec import CompressedImage
+
+
+class BlobStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.store = BlobStore(self._dir.name)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_text_round_trip(self):
+        text = "line\n" * 300_000 + "é ✓"
+        self.store.put_text("ab12", text)
+        self.assertEqual(self.store.read_text("ab12"), text)
+        self.assertEqual(self.store.read_text("ab12", limit=7), "line\nli")
+        self.assertEqual("".join(self.store.iter_text("ab12", chunk_bytes=1000)), text)
+
+    def test_search_across_chunks(self):
+        text = "a" * 1_500_000 + "needle\nhaystack"
+        self.store.put_text("cd34", text)
+        self.assertTrue(self.store.search_text("cd34", "NEEDLE HAY"))
+        self.assertFalse(self.store.search_text("cd34", "needles"))
+
+    def test_encodings_do_not_share_a_file(self):
+        # The same content stored raw (an HTML format) and spilled as text
+        markup = "<b>" + "x" * 1000 + "</b>"
+        self.store.put_bytes("ef56", markup.encode())
+        spilled = SpilledText.write(self.store, "ef56", markup, 10)
+        self.assertNotEqual(spilled.key, "ef56")
+        self.assertEqual(spilled.read(), markup)
+        self.assertEqual(self.store.read_bytes("ef56"), markup.encode())
+
+    def test_corrupt_text_blob_raises_oserror(self):
+        self.store.put_bytes(encoded_key("0a0b", "zt"), b"not zlib at all")
+        spilled = SpilledText(self.store, encoded_key("0a0b", "zt"), "head", 100)
+        with self.assertRaises(OSError):
+            spilled.read()
+        with self.assertRaises(OSError):
+            spilled.contains("x")
+        self.assertEqual(spilled.read(2), "he")  # served from the head
+
+    def test_image_round_trip(self):
+        for fmt in (QImage.Format_ARGB32, QImage.Format_RGB888, QImage.Format_Indexed8):
+            image = QImage(33, 17, fmt)
+            if fmt == QImage.Format_Indexed8:
+                image.setColorTable([QColor("red").rgb(), QColor("blue").rgb()])
+                image.fill(1)
+            else:
+                image.fill(QColor(10, 20, 30))
+            with self.subTest(fmt=fmt):
+                spilled = SpilledImage.write(self.store, f"1{fmt.value:03d}", CompressedImage.encode(image))
+                self.assertTrue(spilled.key.endswith(".png"))
+                self.assertEqual((spilled.width(), spilled.height()), (33, 17))
+                self.assertEqual(spilled.read().convertToFormat(fmt), image)
+
+    def test_corrupt_image_blob_raises_oserror(self):
+        self.store.put_bytes(encoded_key("2b00", "png"), b"not a png")
+        with self.assertRaises(OSError):
+            SpilledImage(self.store, encoded_key("2b00", "png"), 1, 1).read()
+
+    def test_refcounts_and_collect(self):
+        self.store.put_text("9f00", "x")
+        self.store.put_text("9f00", "x")  # stored once, referenced twice
+        self.assertEqual(self.store.refcount("9f00"), 2)
+        self.store.release("9f00")
+        self.assertFalse(self.store.has_garbage())
+        self.store.release("9f00")
+        self.assertTrue(self.store.has_garbage())
+        self.store.retain("9f00")  # copied again before collection
+        list(self.store.collect())
+        self.assertTrue(self.store.exists("9f00"))
+        self.assertEqual(self.store.nbytes(), self.store.size("9f00"))
+        self.store.release("9f00")
+        list(self.store.collect())
+        self.assertFalse(self.store.exists("9f00"))
+        self.assertEqual(self.store.nbytes(), 0)
+
+    def test_purge(self):
+        self.store.put_bytes("7e00", b"data")
+        self.store.purge()
+        self.assertFalse(self.store.exists("7e00"))
+        self.assertTrue(os.path.isdir(self.store.root))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import random
+import tempfile
+import unittest
+from tests.qt import qt_app
+from src.components.cliboard_item_struct import ClipboardItemStruct
+from src.components.clipboard_history import ClipboardHistory
+from src.utils.blob_store import BlobStore
+
+
+def text_item(text):
+    return ClipboardItemStruct(text, "text")
+
+
+class ClipboardHistoryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def test_newest_first_and_count_trim(self):
+        history = ClipboardHistory(max_items=3)
+        items = [text_item(f"entry {i}") for i in range(5)]
+        evicted = []
+        for item in items:
+            evicted += history.add(item)
+        self.assertEqual(list(history), items[:1:-1])
+        self.assertEqual(evicted, items[:2])
+
+    def test_move_to_front(self):
+        history = ClipboardHistory()
+        a, b = text_item("a"), text_item("b")
+        history.add(a)
+        history.add(b)
+        self.assertTrue(history.move_to_front(a.fingerprint()))
+        self.assertEqual(list(history), [a, b])
+        self.assertFalse(history.move_to_front("missing"))
+
+    def test_accounting_follows_add_and_remove(self):
+        history = ClipboardHistory()
+        items = [text_item("x" * (100 * i)) for i in range(1, 4)]
+        for item in items:
+            history.add(item)
+        self.assertEqual(history.nbytes(), sum(item.nbytes() for item in items))
+        history.remove(items[1].fingerprint())
+        self.assertEqual(history.nbytes("text"), items[0].nbytes() + items[2].nbytes())
+        history.clear()
+        self.assertEqual(history.nbytes(), 0)
+
+    def test_over_quota_demotes_oldest_before_evicting(self):
+        demoted = []
+        size = text_item("x" * 1000).nbytes()
+        history = ClipboardHistory(max_items=100, max_bytes=size * 10, quotas={"text": 0.25},
+                                   demote=demoted.append)
+        items = [text_item(f"{i:04d}" + "x" * 996) for i in range(3)]
+        evicted = []
+        for item in items:
+            evicted += history.add(item)
+        # Two fit in the quota; the demote callback frees nothing here, so
+        # the oldest is first demoted, then evicted
+        self.assertEqual(demoted[0], items[0])
+        self.assertIn(items[0], evicted)
+        self.assertLessEqual(history.nbytes("text"), history.quota("text"))
+        self.assertIn(items[2], history)
+
+    def test_demotion_that_frees_memory_keeps_the_entry(self):
+        size = text_item("y" * 20000).nbytes()
+
+        def demote(item):
+            item.compress_text(0)  # stands in for a spill: the entry shrinks
+
+        # Room for one and a half entries as they are, for all three demoted
+        history = ClipboardHistory(max_items=100, max_bytes=size * 3, quotas={"text": 0.5}, demote=demote)
+        items = [text_item("y" * 20000 + str(i)) for i in range(3)]
+        evicted = []
+        for item in items:
+            evicted += history.add(item)
+        self.assertEqual(evicted, [])
+        self.assertEqual(len(history), 3)
+        self.assertEqual(items[0].content, "y" * 20000 + "0")
+
+
+class DiskBudgetTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.store = BlobStore(self._dir.name)
+        rng = random.Random(3)
+        self.items = []
+        for i in range(4):
+            item = text_item("".join(rng.choice("abcdefghij") for _ in range(50_000)))
+            item.spill(self.store, 0)
+            self.items.append(item)
+        self.blob_size = self.items[0].disk_bytes()
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_oldest_entries_on_disk_are_evicted(self):
+        self.assertGreater(self.blob_size, 10_000)
+        history = ClipboardHistory(max_items=100, max_disk_bytes=int(self.blob_size * 2.5))
+        history.add(text_item("in memory, never evicted for disk"))
+        evicted = []
+        for item in self.items:
+            evicted += history.add(item)
+        self.assertEqual(evicted, self.items[:2])
+        self.assertLessEqual(history.disk_bytes(), history.max_disk_bytes)
+        self.assertEqual(len(history), 3)
+
+    def test_recently_used_entries_stay(self):
+        history = ClipboardHistory(max_items=100, max_disk_bytes=int(self.blob_size * 2.5))
+        history.add(self.items[0])
+        history.add(self.items[1])
+        history.move_to_front(self.items[0].fingerprint())
+        self.assertEqual(history.add(self.items[2]), [self.items[1]])
+        history.remove(self.items[0].fingerprint())
+        self.assertEqual(history.disk_bytes(), self.items[2].disk_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
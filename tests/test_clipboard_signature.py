@@ -0,0 +1,48 @@
+import unittest
+from PySide6.QtCore import QByteArray, QMimeData
+from src.utils.clipboard_signature import clipboard_signature
+
+
+def text_mime(text):
+    mime = QMimeData()
+    mime.setText(text)
+    return mime
+
+
+class ClipboardSignatureTest(unittest.TestCase):
+    def test_same_content_same_signature(self):
+        self.assertEqual(clipboard_signature(text_mime("hello")), clipboard_signature(text_mime("hello")))
+
+    def test_same_length_edit_anywhere_is_a_change(self):
+        text = "a" * 100_000
+        for offset in (0, 5000, 50_000, 99_999):
+            edited = text[:offset] + "b" + text[offset + 1:]
+            with self.subTest(offset=offset):
+                self.assertNotEqual(clipboard_signature(text_mime(text)), clipboard_signature(text_mime(edited)))
+
+    def test_format_list_is_part_of_it(self):
+        plain = text_mime("<b>x</b>")
+        rich = text_mime("<b>x</b>")
+        rich.setHtml("<b>x</b>")
+        self.assertNotEqual(clipboard_signature(plain), clipboard_signature(rich))
+
+    def test_images_are_probed(self):
+        mime = QMimeData()
+        mime.setData("image/png", QByteArray(b"\x89PNG" + bytes(64)))
+        other = QMimeData()
+        other.setData("image/png", QByteArray(b"\x89PNG" + bytes(63) + b"\x01"))
+        self.assertIsNotNone(clipboard_signature(mime))
+        self.assertNotEqual(clipboard_signature(mime), clipboard_signature(other))
+
+    def test_nothing_to_probe(self):
+        mime = QMimeData()
+        mime.setData("application/x-custom", QByteArray(b"data"))
+        self.assertIsNone(clipboard_signature(mime))
+
+    def test_sequence_number_wins(self):
+        self.assertEqual(clipboard_signature(text_mime("a"), sequence=7), clipboard_signature(text_mime("b"), sequence=7))
+        self.assertNotEqual(clipboard_signature(text_mime("a"), sequence=7), clipboard_signature(text_mime("a"), sequence=8))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import unittest
+from PySide6.QtCore import QUrl
+from PySide6.QtGui import QImage
+from tests.qt import qt_app
+from src.components.cliboard_item_struct import ClipboardItemStruct, ContentType
+from src.utils.content_classifier import classify, classify_text, classify_urls, MAX_JSON_PARSE_CHARS
+
+
+class ClassifyTextTest(unittest.TestCase):
+    def assertKinds(self, kind, texts):
+        for text in texts:
+            with self.subTest(text=text[:40]):
+                self.assertEqual(classify_text(text), kind)
+
+    def test_colors(self):
+        self.assertKinds(ContentType.COLOR, ["#fff", "#1E90FF", " #1e90ff80\n", "rgb(30, 144, 255)",
+                                             "rgba(0 0 0 / 50%)", "hsl(210, 100%, 56%)"])
+
+    def test_urls(self):
+        self.assertKinds(ContentType.URL, ["https://example.com/a?b=c", "www.example.org/page",
+                                           "mailto:someone@example.com"])
+
+    def test_paths(self):
+        self.assertKinds(ContentType.FILE, ["/usr/local/bin/python3", "~/notes/todo.md", "./build/out.log",
+                                            "C:\\Users\\me\\file.txt", "\\\\server\\share\\doc.pdf",
+                                            "file:///tmp/x.png"])
+
+    def test_json(self):
+        self.assertKinds(ContentType.JSON, ['{"a": 1, "b": [true, null]}', "[1, 2, 3]",
+                                            json.dumps({"k": list(range(50))}, indent=2)])
+
+    def test_json_too_big_to_parse_is_judged_by_its_shape(self):
+        text = "[" + "1," * (MAX_JSON_PARSE_CHARS // 2) + "oops]"
+        self.assertEqual(classify_text(text), ContentType.JSON)
+
+    def test_code(self):
+        self.assertKinds(ContentType.CODE, [
+            "def add(a, b):\n    return a + b\n",
+            "for (let i = 0; i < n; i++) {\n  total += i;\n}",
+            "SELECT id FROM users\nWHERE name != 'x';",
+        ])
+
+    def test_html_markup_in_text(self):
+        self.assertEqual(classify_text("<div><p>hello</p><br></div>"), ContentType.HTML)
+
+    def test_prose_stays_text(self):
+        self.assertKinds(ContentType.TEXT, [
+            "Meeting moved to 3pm, see you there.",
+            "A slash/in the middle is not a path",
+            "{not json at all}",
+            "#notacolor",
+            "   \n  ",
+            "Dear team,\nthe report is attached.\nThanks\n",
+        ])
+
+
+class ClassifyItemTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def test_storage_types(self):
+        image = QImage(4, 4, QImage.Format_RGB32)
+        image.fill(0)
+        self.assertEqual(classify(ClipboardItemStruct(image, "image")), ContentType.IMAGE)
+        self.assertEqual(classify(ClipboardItemStruct("<b>x</b>", "html")), ContentType.HTML)
+        self.assertEqual(classify(ClipboardItemStruct("#abcdef", "text")), ContentType.COLOR)
+
+    def test_urls(self):
+        self.assertEqual(classify_urls([QUrl.fromLocalFile("/tmp/a"), QUrl.fromLocalFile("/tmp/b")]),
+                         ContentType.FILE)
+        self.assertEqual(classify_urls([QUrl.fromLocalFile("/tmp/a"), QUrl("https://example.com")]),
+                         ContentType.URL)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from PySide6.QtGui import QColor, QImage
+from PySide6.QtTest import QTest
+from tests.qt import qt_app
+from src.utils.file_preview import FilePreviewer, read_preview, MAX_HEAD_BYTES, THUMBNAIL_SIZE
+
+
+class ReadPreviewTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.root = self._dir.name
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def write(self, name, data: bytes) -> str:
+        path = os.path.join(self.root, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_text(self):
+        preview = read_preview(self.write("notes.txt", "héllo\nworld\n".encode()))
+        self.assertEqual((preview.kind, preview.text, preview.truncated), ("text", "héllo\nworld\n", False))
+        self.assertTrue(preview.summary().startswith("notes.txt (13 B)"))
+
+    def test_huge_file_only_has_its_head_read(self):
+        path = self.write("huge.log", b"line\n" * 100)
+        with open(path, "r+b") as f:
+            f.truncate(2 * 1024 ** 3)  # sparse: 2 GB that cost nothing to make
+        preview = read_preview(path)
+        self.assertEqual(preview.size, 2 * 1024 ** 3)
+        self.assertEqual(preview.kind, "binary")  # the sparse part reads as zeros
+        path = self.write("big.txt", b"x" * (MAX_HEAD_BYTES * 3))
+        preview = read_preview(path)
+        self.assertEqual((preview.kind, len(preview.text), preview.truncated), ("text", MAX_HEAD_BYTES, True))
+
+    def test_multibyte_character_cut_by_the_head_is_still_text(self):
+        path = self.write("utf8.txt", b"a" * (MAX_HEAD_BYTES - 1) + "é".encode() * 10)
+        self.assertEqual(read_preview(path).kind, "text")
+
+    def test_binary(self):
+        preview = read_preview(self.write("blob.bin", bytes(range(256)) * 4))
+        self.assertEqual(preview.kind, "binary")
+
+    def test_image_is_thumbnailed(self):
+        image = QImage(2000, 1000, QImage.Format_RGB32)
+        image.fill(QColor("teal"))
+        path = os.path.join(self.root, "photo.png")
+        image.save(path, "PNG")
+        preview = read_preview(path)
+        self.assertEqual(preview.kind, "image")
+        self.assertEqual(preview.image.width(), THUMBNAIL_SIZE.width())
+        self.assertEqual(preview.image.height(), THUMBNAIL_SIZE.height() // 2)
+
+    def test_directory_and_missing(self):
+        self.write("a.txt", b"a")
+        os.mkdir(os.path.join(self.root, "sub"))
+        self.assertEqual(read_preview(self.root).text, "a.txt\nsub/")
+        self.assertEqual(read_preview(os.path.join(self.root, "gone")).kind, "missing")
+
+
+class FilePreviewerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "file.txt")
+        self.previewer = FilePreviewer()
+        self.ready = []
+        self.previewer.ready.connect(self.ready.append)
+
+    def tearDown(self):
+        self.previewer._pool.waitForDone()
+        self._dir.cleanup()
+
+    def write(self, text):
+        with open(self.path, "w") as f:
+            f.write(text)
+
+    def preview(self):
+        self.ready.clear()
+        self.previewer.request(self.path)
+        self.previewer._pool.waitForDone()
+        for _ in range(100):
+            if self.ready:
+                break
+            QTest.qWait(5)
+        return self.ready[-1]
+
+    def test_cached_until_the_file_changes(self):
+        self.write("first")
+        first = self.preview()
+        self.assertIs(self.preview(), first)
+        self.write("second version")
+        self.assertEqual(self.preview().text, "second version")
+
+    def test_only_the_latest_request_is_delivered(self):
+        self.write("content")
+        self.previewer.request(os.path.join(self._dir.name, "older"))
+        self.assertEqual(self.preview().path, self.path)
+        self.assertEqual(len(self.ready), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
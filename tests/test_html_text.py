@@ -0,0 +1,42 @@
+import unittest
+from src.utils.html_text import scan_html, html_to_text
+
+
+class ScanHtmlTest(unittest.TestCase):
+    def test_editor_markup_is_not_real(self):
+        markup = '<div style="color: #d4d4d4;"><span style="color: #569cd6;">def</span> main():</div>'
+        scan = scan_html(markup)
+        self.assertFalse(scan.is_real)
+        self.assertEqual(scan.text, "def main():")
+
+    def test_semantic_markup_is_real(self):
+        for markup in ("<p>Hello</p>", "<ul><li>one</li></ul>", 'see <a href="x">this</a>', "<BR/>"):
+            with self.subTest(markup=markup):
+                self.assertTrue(scan_html(markup).is_real)
+
+    def test_blocks_become_lines(self):
+        markup = "<h1>Title</h1><p>First   paragraph</p><table><tr><td>a</td><td>b</td></tr></table>"
+        self.assertEqual(html_to_text(markup), "Title\nFirst paragraph\na b")
+
+    def test_skipped_content_and_entities(self):
+        markup = ("<html><head><title>t</title><style>p {}</style></head>"
+                  "<body><script>alert(1)</script><p>Fish &amp; chips &lt;3</p><!-- note --></body></html>")
+        self.assertEqual(html_to_text(markup), "Fish & chips <3")
+
+    def test_pre_keeps_whitespace(self):
+        self.assertEqual(html_to_text("<pre>a  b\n  c</pre>"), "a  b\n  c")
+
+    def test_truncated_text_still_finds_real_tags(self):
+        markup = "<span>" + "x" * 500 + "</span><span>more</span><p>late</p>"
+        scan = scan_html(markup, max_chars=100)
+        self.assertEqual(scan.text, "x" * 100)
+        self.assertTrue(scan.truncated)
+        self.assertTrue(scan.is_real)
+
+    def test_short_markup_is_not_truncated(self):
+        scan = scan_html("<p>short</p>", max_chars=100)
+        self.assertFalse(scan.truncated)
+
+
+if __name__ == "__main__":
+    unittest.main()
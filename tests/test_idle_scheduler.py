@@ -0,0 +1,77 @@
+import time
+import unittest
+from PySide6.QtTest import QTest
+from tests.qt import qt_app
+from src.utils.idle_scheduler import IdleScheduler
+
+
+class IdleSchedulerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def setUp(self):
+        # max_load above any real load: the tests must not wait on the machine
+        self.scheduler = IdleScheduler(idle_delay_ms=20, slice_ms=2, max_load=1e9)
+        self.ran = []
+
+    def tearDown(self):
+        self.scheduler.clear()
+
+    def run_until_idle(self, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.scheduler._depth and time.monotonic() < deadline:
+            QTest.qWait(5)
+
+    def test_lower_priority_runs_first(self):
+        self.scheduler.schedule(lambda: self.ran.append("late"), priority=50)
+        self.scheduler.schedule(lambda: self.ran.append("early"), priority=10)
+        self.scheduler.schedule(lambda: self.ran.append("early too"), priority=10)
+        self.run_until_idle()
+        self.assertEqual(self.ran, ["early", "early too", "late"])
+
+    def test_generators_run_over_several_slices(self):
+        def steps():
+            for i in range(5):
+                self.ran.append(i)
+                yield
+
+        self.scheduler.schedule(steps)
+        self.run_until_idle()
+        self.assertEqual(self.ran, [0, 1, 2, 3, 4])
+
+    def test_nothing_runs_before_idle_delay(self):
+        self.scheduler.idle_delay_ms = 200
+        self.scheduler.schedule(lambda: self.ran.append("task"))
+        QTest.qWait(50)
+        self.assertEqual(self.ran, [])
+
+    def test_activity_postpones_work(self):
+        self.scheduler.idle_delay_ms = 100
+        self.scheduler.schedule(lambda: self.ran.append("task"))
+        for _ in range(4):
+            QTest.qWait(50)
+            self.scheduler.notify_activity()
+        self.assertEqual(self.ran, [])
+        self.run_until_idle()
+        self.assertEqual(self.ran, ["task"])
+
+    def test_cancelled_task_never_runs(self):
+        task = self.scheduler.schedule(lambda: self.ran.append("cancelled"))
+        self.scheduler.schedule(lambda: self.ran.append("kept"))
+        self.scheduler.cancel(task)
+        self.run_until_idle()
+        self.assertEqual(self.ran, ["kept"])
+
+    def test_failing_task_does_not_stop_the_queue(self):
+        def fail():
+            raise ValueError("boom")
+
+        self.scheduler.schedule(fail)
+        self.scheduler.schedule(lambda: self.ran.append("next"))
+        self.run_until_idle()
+        self.assertEqual(self.ran, ["next"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import unittest
+from PySide6.QtGui import QColor, QImage
+from PySide6.QtTest import QTest
+from tests.qt import qt_app
+from src.components.cliboard_item_struct import ClipboardItemStruct, fingerprint_image
+from src.utils.image_codec import CompressedImage, DecodedImageCache, ImageCompressor, normalize_image
+
+
+def screenshot(width=800, height=600) -> QImage:
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor(240, 240, 240))
+    for y in range(0, height, 20):
+        for x in range(width):
+            image.setPixelColor(x, y, QColor(20, 20, 20))
+    return image
+
+
+def solid(width, height, color="red") -> QImage:
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor(color))
+    return image
+
+
+class NormalizeImageTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def assertNormalizesTo(self, image, fmt):
+        normalized = normalize_image(image)
+        self.assertEqual(normalized.format(), fmt)
+        # Lossless: the same pixels in any format
+        self.assertEqual(normalized.convertToFormat(QImage.Format_ARGB32), image.convertToFormat(QImage.Format_ARGB32))
+
+    def test_grey_pixels(self):
+        self.assertNormalizesTo(screenshot(), QImage.Format_Grayscale8)
+
+    def test_few_colours(self):
+        image = solid(50, 50, "red")
+        image.setPixelColor(3, 3, QColor("blue"))
+        self.assertNormalizesTo(image, QImage.Format_Indexed8)
+
+    def test_many_opaque_colours(self):
+        image = QImage(64, 64, QImage.Format_ARGB32)
+        for y in range(64):
+            for x in range(64):
+                image.setPixelColor(x, y, QColor(x * 4, y * 4, 128))
+        self.assertNormalizesTo(image, QImage.Format_RGB888)
+
+    def test_many_colours_with_alpha(self):
+        image = QImage(64, 64, QImage.Format_ARGB32)
+        for y in range(64):
+            for x in range(64):
+                image.setPixelColor(x, y, QColor(x * 4, y * 4, 128, 100))
+        self.assertNormalizesTo(image, QImage.Format_ARGB32)
+
+    def test_odd_width_with_scanline_padding(self):
+        image = solid(13, 7, "green").convertToFormat(QImage.Format_RGB888)
+        self.assertNormalizesTo(image, QImage.Format_Indexed8)
+
+    def test_same_pixels_same_fingerprint(self):
+        image = QImage(40, 30, QImage.Format_ARGB32)
+        for y in range(30):
+            for x in range(40):
+                image.setPixelColor(x, y, QColor(x * 6, y * 8, 77))
+        variants = [image, image.convertToFormat(QImage.Format_RGB32),
+                    image.convertToFormat(QImage.Format_ARGB32_Premultiplied)]
+        fingerprints = {fingerprint_image(normalize_image(v)) for v in variants}
+        self.assertEqual(len(fingerprints), 1)
+
+    def test_other_depths_are_left_alone(self):
+        mono = QImage(16, 16, QImage.Format_Mono)
+        mono.fill(1)
+        self.assertIs(normalize_image(mono), mono)
+        self.assertTrue(normalize_image(QImage()).isNull())
+
+
+class CompressedImageTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def test_lossless_and_smaller(self):
+        image = screenshot()
+        compressed = CompressedImage.encode(image)
+        self.assertEqual((compressed.width(), compressed.height()), (800, 600))
+        self.assertLess(compressed.nbytes(), image.sizeInBytes() // 10)
+        self.assertEqual(compressed.read().convertToFormat(QImage.Format_RGB32), image)
+
+
+class DecodedImageCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def test_loads_once(self):
+        cache = DecodedImageCache()
+        loads = []
+
+        def load():
+            loads.append(1)
+            return solid(10, 10)
+
+        first = cache.get("a", load)
+        self.assertIs(cache.get("a", load), first)
+        self.assertEqual(len(loads), 1)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_least_recently_used_is_dropped_past_the_budget(self):
+        size = solid(100, 100).sizeInBytes()
+        cache = DecodedImageCache(max_bytes=size * 2)
+        for key in ("a", "b"):
+            cache.get(key, lambda: solid(100, 100))
+        cache.get("a", lambda: self.fail("a is cached"))
+        cache.get("c", lambda: solid(100, 100))
+        self.assertEqual(list(cache._images), ["a", "c"])
+        self.assertEqual(cache.stats()["bytes"], size * 2)
+
+    def test_image_over_the_budget_is_not_kept(self):
+        cache = DecodedImageCache(max_bytes=100)
+        cache.get("big", lambda: solid(100, 100))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_forget(self):
+        cache = DecodedImageCache()
+        cache.get("a", lambda: solid(10, 10))
+        cache.forget("a")
+        self.assertEqual((cache.stats()["entries"], cache.stats()["bytes"]), (0, 0))
+
+
+class ImageCompressorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def setUp(self):
+        self.compressor = ImageCompressor()
+
+    def wait_for(self, received):
+        self.compressor.wait_for_done()
+        for _ in range(100):
+            if received:
+                return received[0]
+            QTest.qWait(5)
+        self.fail("no signal")
+
+    def test_compressed_on_the_pool(self):
+        image = screenshot()
+        item = ClipboardItemStruct(image, "image")
+        received = []
+        self.compressor.compressed.connect(lambda *args: received.append(args))
+        self.compressor.request(item, image)
+        got_item, compressed = self.wait_for(received)
+        self.assertIs(got_item, item)
+        self.assertIsInstance(compressed, CompressedImage)
+        self.assertTrue(item.compress(compressed))
+        self.assertIsNone(item.raw_image())
+
+    def test_png_of_an_item(self):
+        image = solid(64, 32, "blue")
+        item = ClipboardItemStruct(image, "image")
+        received = []
+        self.compressor.encoded.connect(lambda *args: received.append(args))
+        self.compressor.request_png(item)
+        _, png = self.wait_for(received)
+        self.assertEqual(QImage.fromData(png, "PNG").convertToFormat(QImage.Format_RGB32), image)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import random
+import unittest
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QImage, QPainter, QTransform
+from tests.qt import qt_app
+from src.utils.image_hash import BKTree, dhash, hamming, mean_difference
+
+
+def gradient(width=200, height=120, dot=None):
+    image = QImage(width, height, QImage.Format_RGB32)
+    for x in range(width):
+        for y in range(height):
+            image.setPixelColor(x, y, QColor(x * 255 // width, y * 255 // height, 128))
+    if dot is not None:
+        painter = QPainter(image)
+        painter.fillRect(dot[0], dot[1], 4, 4, Qt.white)
+        painter.end()
+    return image
+
+
+def flat(color):
+    image = QImage(64, 64, QImage.Format_RGB32)
+    image.fill(QColor(color))
+    return image
+
+
+class DHashTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def test_small_change_is_near(self):
+        base = dhash(gradient())
+        self.assertEqual(dhash(gradient()), base)
+        self.assertLessEqual(hamming(dhash(gradient(dot=(100, 60))), base), 8)
+
+    def test_different_images_are_far(self):
+        turned = gradient().transformed(QTransform().rotate(180))
+        self.assertGreater(hamming(dhash(turned), dhash(gradient())), 64)
+
+    def test_flat_colours_hash_alike_but_differ_in_pixels(self):
+        red, blue = flat("red"), flat("blue")
+        self.assertEqual(dhash(red), dhash(blue))
+        self.assertGreater(mean_difference(red, blue), 50)
+        self.assertEqual(mean_difference(red, flat("red")), 0)
+
+
+class BKTreeTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.hashes = {f"k{i}": rng.getrandbits(64) for i in range(300)}
+        # A cluster of near copies around one hash
+        center = self.hashes["k0"]
+        for i in range(10):
+            self.hashes[f"near{i}"] = center ^ (1 << i) ^ (1 << (i + 20))
+        self.tree = BKTree()
+        for key, value in self.hashes.items():
+            self.tree.add(key, value)
+
+    def brute_force(self, value, radius):
+        found = [(hamming(h, value), key) for key, h in self.hashes.items()]
+        return sorted(entry for entry in found if entry[0] <= radius)
+
+    def test_search_matches_brute_force(self):
+        for radius in (0, 2, 10, 24):
+            for probe in ("k0", "k5", "near3"):
+                value = self.hashes[probe]
+                self.assertEqual(sorted(self.tree.search(value, radius)), self.brute_force(value, radius))
+
+    def test_results_closest_first(self):
+        distances = [distance for distance, _ in self.tree.search(self.hashes["k0"], 4)]
+        self.assertEqual(distances, sorted(distances))
+        self.assertEqual(len(distances), 11)
+
+    def test_remove_and_rebuild(self):
+        for i in range(250):
+            self.tree.remove(f"k{i}")
+            del self.hashes[f"k{i}"]
+        self.assertEqual(len(self.tree), len(self.hashes))
+        self.assertNotIn("k0", self.tree)
+        self.assertIn("near0", self.tree)
+        value = self.hashes["near0"]
+        self.assertEqual(sorted(self.tree.search(value, 30)), self.brute_force(value, 30))
+
+    def test_shared_hash_and_readd(self):
+        self.tree.add("twin", self.hashes["k1"])
+        keys = {key for distance, key in self.tree.search(self.hashes["k1"], 0)}
+        self.assertEqual(keys, {"k1", "twin"})
+        self.tree.add("twin", self.hashes["k2"])  # moved, not duplicated
+        self.assertEqual({key for _, key in self.tree.search(self.hashes["k1"], 0)}, {"k1"})
+        self.tree.clear()
+        self.assertEqual(len(self.tree), 0)
+        self.assertEqual(self.tree.search(self.hashes["k1"], 64), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import gc
+import unittest
+from src.utils.text_codec import CompressedText, RecentTexts, MIN_DELTA_SHARE
+
+HEAD = 64
+
+
+def document(seed, lines=2000):
+    return "\n".join(f"line {i} of document {seed}" for i in range(lines))
+
+
+class CompressedTextTest(unittest.TestCase):
+    def test_standalone_round_trip(self):
+        text = document(1) + " é ✓ \ud800"  # lone surrogates survive too
+        compressed = CompressedText.encode(text, HEAD)
+        self.assertFalse(compressed.is_delta)
+        self.assertEqual(compressed.read(), text)
+        self.assertEqual(len(compressed), len(text))
+        self.assertLess(compressed.nbytes(), len(text) // 4)
+
+    def test_read_limit(self):
+        text = document(1)
+        compressed = CompressedText.encode(text, HEAD)
+        self.assertEqual(compressed.read(10), text[:10])
+        self.assertEqual(compressed.read(5000), text[:5000])
+
+    def test_delta_round_trip(self):
+        base = CompressedText.encode(document(1), HEAD)
+        edited = document(1).replace("line 1000 of", "LINE ONE THOUSAND of")
+        delta = CompressedText.encode(edited, HEAD, [base])
+        self.assertTrue(delta.is_delta)
+        self.assertIs(delta.base, base)
+        self.assertEqual(delta.read(), edited)
+        self.assertLess(delta.nbytes(), base.nbytes() // 4)
+
+    def test_appended_and_prepended_text(self):
+        base = CompressedText.encode(document(1), HEAD)
+        for text in (document(1) + "\ntrailer", "header\n" + document(1), document(1)[:-100]):
+            delta = CompressedText.encode(text, HEAD, [base])
+            self.assertTrue(delta.is_delta)
+            self.assertEqual(delta.read(), text)
+
+    def test_picks_most_similar_base(self):
+        other = CompressedText.encode(document(2), HEAD)
+        close = CompressedText.encode(document(1), HEAD)
+        delta = CompressedText.encode(document(1) + "!", HEAD, [other, close])
+        self.assertIs(delta.base, close)
+
+    def test_unrelated_text_is_standalone(self):
+        base = CompressedText.encode(document(1), HEAD)
+        text = document(1)[:int(len(document(1)) * MIN_DELTA_SHARE) - 10] + document(2)
+        compressed = CompressedText.encode(text, HEAD, [base])
+        self.assertFalse(compressed.is_delta)
+        self.assertEqual(compressed.read(), text)
+
+    def test_contains(self):
+        base = CompressedText.encode(document(1), HEAD)
+        delta = CompressedText.encode(document(1) + "\nneedle in the end", HEAD, [base])
+        self.assertTrue(delta.contains("NEEDLE IN"))
+        self.assertTrue(delta.contains("line 1500 of document 1"))
+        self.assertFalse(base.contains("needle"))
+
+
+class RecentTextsTest(unittest.TestCase):
+    def test_keeps_last_standalone_texts(self):
+        recent = RecentTexts(size=2)
+        texts = [CompressedText.encode(document(i), HEAD) for i in range(3)]
+        for text in texts:
+            recent.add(text)
+        self.assertEqual(recent.snapshot(), texts[1:])
+        delta = CompressedText.encode(document(2) + "!", HEAD, texts)
+        recent.add(delta)  # deltas are never bases
+        self.assertEqual(recent.snapshot(), texts[1:])
+        recent.clear()
+        self.assertEqual(recent.snapshot(), [])
+
+    def test_does_not_keep_texts_alive(self):
+        recent = RecentTexts()
+        kept = CompressedText.encode(document(1), HEAD)
+        dropped = CompressedText.encode(document(2), HEAD)
+        recent.add(kept)
+        recent.add(dropped)
+        del dropped
+        gc.collect()
+        self.assertEqual(recent.snapshot(), [kept])
+
+
+if __name__ == "__main__":
+    unittest.main()
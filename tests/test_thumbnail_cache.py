@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QColor, QImage
+from tests.qt import qt_app
+from src.utils.thumbnail_cache import ThumbnailCache, LIST_THUMBNAIL, PREVIEW_THUMBNAIL, scale_image
+
+
+def noise(seed, size=256):
+    image = QImage(size, size, QImage.Format_RGB32)
+    for y in range(size):
+        for x in range(size):
+            image.setPixel(x, y, (x * 2654435761 + y * 40503 + seed * 97) & 0xffffff)
+    return image
+
+
+class ThumbnailCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        qt_app()
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.cache = ThumbnailCache(self._dir.name)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def files(self):
+        return sorted(name for _, _, names in os.walk(self._dir.name) for name in names)
+
+    def test_scaled_once_then_read_back(self):
+        source = QImage(2000, 1000, QImage.Format_RGB32)
+        source.fill(QColor("green"))
+        preview = self.cache.get_or_create("ab" * 16, PREVIEW_THUMBNAIL, source)
+        self.assertEqual(preview.size(), QSize(1024, 512))
+        # Served from the cache, whatever source is given
+        self.assertEqual(self.cache.get_or_create("ab" * 16, PREVIEW_THUMBNAIL, QImage()), preview)
+        fresh = ThumbnailCache(self._dir.name)
+        self.assertEqual(fresh.get("ab" * 16, PREVIEW_THUMBNAIL).size(), QSize(1024, 512))
+
+    def test_small_images_are_not_scaled(self):
+        image = QImage(20, 10, QImage.Format_RGB32)
+        self.assertIs(scale_image(image, LIST_THUMBNAIL), image)
+
+    def test_not_persisted(self):
+        self.cache.get_or_create("cd" * 16, LIST_THUMBNAIL, noise(1), persist=False)
+        self.assertEqual(self.files(), [])
+        self.assertIsNotNone(self.cache.get("cd" * 16, LIST_THUMBNAIL))  # memory only
+
+    def test_forget_and_clear_delete_files(self):
+        for fingerprint in ("01" * 16, "02" * 16):
+            self.cache.get_or_create(fingerprint, PREVIEW_THUMBNAIL, noise(1))
+            self.cache.get_or_create(fingerprint, LIST_THUMBNAIL, noise(1))
+        self.cache.forget("01" * 16)
+        self.assertEqual(len(self.files()), 2)
+        self.assertIsNone(self.cache.get("01" * 16, LIST_THUMBNAIL))
+        self.cache.clear()
+        self.assertEqual(self.files(), [])
+        self.assertEqual(self.cache.disk_bytes(), 0)
+
+    def test_disk_budget_drops_least_recently_used(self):
+        self.cache.put("00" * 16, PREVIEW_THUMBNAIL, noise(0))
+        size = self.cache.disk_bytes()
+        self.cache.max_disk_bytes = int(size * 3.5)
+        for seed in range(1, 5):
+            self.cache.put(f"{seed:02d}" * 16, PREVIEW_THUMBNAIL, noise(seed))
+            if seed == 2:
+                self.cache.get("00" * 16, PREVIEW_THUMBNAIL)  # used again, kept
+        self.assertLessEqual(self.cache.disk_bytes(), self.cache.max_disk_bytes)
+        kept = {name.split("-")[0][:2] for name in self.files()}
+        self.assertEqual(kept, {"00", "03", "04"})
+
+
+if __name__ == "__main__":
+    unittest.main()